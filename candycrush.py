@@ -1,86 +1,339 @@
 # candycrush.py
 
-from tmge import Game, GameBoard, Tile, Location
+from tmge import Game, GameBoard, Tile, ArrayGrid, zobrist_keys
 from observer import Subject
+from collections import namedtuple
+from operator import attrgetter
 import random
 
 # Available colors for game pieces
 CANDY_TYPES = ["Red", "Orange", "Yellow", "Green", "Blue", "Purple"]
 
+# Immutable copy of a Candy Crush game; cells hold each grid cell's candy type or None
+CandyCrushSnapshot = namedtuple('CandyCrushSnapshot', [
+    'rows', 'cols', 'cells', 'selected', 'matches', 'score', 'level',
+    'player_timers', 'game_over', 'running', 'active_player_index',
+    'last_update_time', 'player_scores', 'timer', 'rng_state',
+])
+
+# What the Zobrist hash and the packed grid record for a candy tile
+candy_kind = attrgetter('candy_type')
+
 class CandyTile(Tile):
     # Represents a single candy piece with a color type
+    __slots__ = ('candy_type',)
+    
     def __init__(self, location=None, candy_type=None):
         super().__init__(location, 10)
         self.candy_type = candy_type if candy_type else random.choice(CANDY_TYPES)
         
     def __str__(self):
         return self.candy_type[0]
-        
+
+# Packed grid codec: code k holds the shared tile of CANDY_TYPES[k - 1], 0 is empty
+candy_tiles = (None,) + tuple(CandyTile.of(candy_type) for candy_type in CANDY_TYPES)
+        
+class CandyBitboards:
+    # One bitmask per candy type. Cell (i, j) is bit i * (cols + 1) + j, so every
+    # row ends in an empty guard bit and horizontal shifts never wrap rows
+    def __init__(self, rows: int, cols: int):
+        self.rows = rows
+        self.cols = cols
+        self.stride = cols + 1
+        self.masks = {}
+        self.column_masks = [
+            sum(1 << (i * self.stride + j) for i in range(rows)) for j in range(cols)
+        ]
+    
+    def set(self, i, j, old_type, new_type):
+        bit = 1 << (i * self.stride + j)
+        if old_type is not None:
+            self.masks[old_type] = self.masks.get(old_type, 0) & ~bit
+        if new_type is not None:
+            self.masks[new_type] = self.masks.get(new_type, 0) | bit
+    
+    def rebuild(self, grid):
+        self.masks = {}
+        for j in range(self.cols):
+            self.sync_column(grid, j)
+    
+    def sync_column(self, grid, j):
+        column = ~self.column_masks[j]
+        for candy_type in self.masks:
+            self.masks[candy_type] &= column
+        for i in range(self.rows):
+            tile = grid.get_tile(i, j)
+            if tile:
+                self.set(i, j, None, tile.candy_type)
+    
+    # Marks every cell that is part of a horizontal or vertical run of 3+
+    def match_mask(self):
+        stride = self.stride
+        matched = 0
+        for mask in self.masks.values():
+            runs = mask & (mask >> 1) & (mask >> 2)
+            matched |= runs | (runs << 1) | (runs << 2)
+            runs = mask & (mask >> stride) & (mask >> 2 * stride)
+            matched |= runs | (runs << stride) | (runs << 2 * stride)
+        return matched
+    
+    def cells(self, mask):
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(divmod(low.bit_length() - 1, self.stride))
+            mask ^= low
+        return result
+
 class CandyCrushBoard(GameBoard):
     # Manages the game board state and match detection
-    def __init__(self, rows: int = 9, cols: int = 9):
-        super().__init__(rows, cols)
-        self.selected_tile = None
+    tile_kind = candy_kind
+    tile_set = candy_tiles
+    
+    def __init__(self, rows: int = 9, cols: int = 9, use_bitboard: bool = False, rng=None,
+                 packed_grid: bool = False, hashing: bool = False):
+        super().__init__(rows, cols, rng=rng, packed_grid=packed_grid, hashing=hashing)
+        # (i, j) of the selected cell, or None
+        self.selected = None
         self.matches = []
+        self.last_changed_cells = set()
+        # Index of legal swaps, rebuilt lazily; None means it must be built from scratch
+        self._legal_moves = None
+        self._dirty_rows = set()
+        self._dirty_cols = set()
+        self.bitboards = CandyBitboards(rows, cols) if use_bitboard else None
         self.populate_board()
         
-    def populate_board(self):
-        for i in range(self.plane.i_length):
-            for j in range(self.plane.j_length):
-                location = Location(i, j)
-                tile = CandyTile(location)
-                self.plane.set_tile(i, j, tile)
+    # Builds a match-free board in one pass, optionally retrying until a move exists
+    def populate_board(self, ensure_move: bool = True, max_attempts: int = 100):
+        for _ in range(max_attempts):
+            self.generate_match_free()
+            if not ensure_move or self.has_legal_move():
+                break
         
-        self.resolve_initial_matches()
-                
-    def resolve_initial_matches(self):
-        matches_found = True
-        while matches_found:
-            self.find_matches()
-            if not self.matches:
-                matches_found = False
+        if self.bitboards:
+            self.bitboards.rebuild(self.plane)
+    
+    # Picks each cell's type excluding only colors that would complete a run
+    # with its two left or two upper neighbours
+    def generate_match_free(self):
+        grid = self.plane
+        types = [[None] * grid.j_length for _ in range(grid.i_length)]
+        self._legal_moves = None
+        
+        for i in range(grid.i_length):
+            row = types[i]
+            for j in range(grid.j_length):
+                excluded = self._run_colors(types, i, j)
+                choices = [t for t in CANDY_TYPES if t not in excluded] or CANDY_TYPES
+                row[j] = self.rng.choice(choices)
+                grid.set_tile(i, j, CandyTile.of(row[j]))
+    
+    # Colors that would complete a run of three with the two cells to the left of or
+    # above (i, j) in a layout being filled row by row
+    @staticmethod
+    def _run_colors(layout, i, j):
+        excluded = set()
+        row = layout[i]
+        if j >= 2 and row[j - 1] == row[j - 2]:
+            excluded.add(row[j - 1])
+        if i >= 2 and layout[i - 1][j] == layout[i - 2][j]:
+            excluded.add(layout[i - 1][j])
+        return excluded
+    
+    # True when no swap on the board can make a match
+    def is_dead(self):
+        return not self.legal_moves()
+    
+    # Rearranges the candies already on the board into a match-free layout with at
+    # least one legal move, building it cell by cell instead of shuffling and rescanning.
+    # Falls back to a freshly generated board if no arrangement is found.
+    def reshuffle(self, max_attempts: int = 100):
+        grid = self.plane
+        rows, cols = grid.i_length, grid.j_length
+        candies = [grid.get_tile(i, j).candy_type
+                   for i in range(rows) for j in range(cols) if grid.get_tile(i, j)]
+        
+        for _ in range(max_attempts):
+            layout = self._arrange(candies, rows, cols)
+            if layout is None:
+                continue
+            for i in range(rows):
+                for j in range(cols):
+                    grid.set_tile(i, j, CandyTile.of(layout[i][j]))
+            if self.has_legal_move():
+                break
+        else:
+            self.generate_match_free()
+            if not self.has_legal_move():
+                self.populate_board()
+        
+        self.selected = None
+        self.matches = []
+        self.last_changed_cells = {(i, j) for i in range(rows) for j in range(cols)}
+        self._legal_moves = None
+        if self.bitboards:
+            self.bitboards.rebuild(grid)
+        return True
+    
+    # Deals a shuffled pool of candies out row by row, skipping any candy that would
+    # complete a run; returns None when the pool runs out of usable candies
+    def _arrange(self, candies, rows, cols):
+        if len(candies) != rows * cols:
+            return None
+        pool = list(candies)
+        self.rng.shuffle(pool)
+        layout = [[None] * cols for _ in range(rows)]
+        
+        for i in range(rows):
+            row = layout[i]
+            for j in range(cols):
+                excluded = self._run_colors(layout, i, j)
+                for index, candy_type in enumerate(pool):
+                    if candy_type not in excluded:
+                        row[j] = pool.pop(index)
+                        break
+                else:
+                    return None
+        return layout
+    
+    def has_legal_move(self):
+        grid = self.plane
+        for i in range(grid.i_length):
+            for j in range(grid.j_length):
+                if j + 1 < grid.j_length and self.swap_makes_match(i, j, i, j + 1):
+                    return True
+                if i + 1 < grid.i_length and self.swap_makes_match(i, j, i + 1, j):
+                    return True
+        return False
+    
+    # Every adjacent swap that would make a match, as sorted ((i1, j1), (i2, j2)) pairs.
+    # Swap legality only depends on the rows and columns through its two cells, so
+    # after a change only pairs touching a changed row or column are re-tested.
+    def legal_moves(self):
+        grid = self.plane
+        rows, cols = grid.i_length, grid.j_length
+        if self._legal_moves is None:
+            self._legal_moves = set()
+            candidates = set()
+            for i in range(rows):
+                for j in range(cols):
+                    if j + 1 < cols:
+                        candidates.add(((i, j), (i, j + 1)))
+                    if i + 1 < rows:
+                        candidates.add(((i, j), (i + 1, j)))
+        else:
+            candidates = set()
+            for i in self._dirty_rows:
+                for j in range(cols):
+                    if j + 1 < cols:
+                        candidates.add(((i, j), (i, j + 1)))
+                    if i > 0:
+                        candidates.add(((i - 1, j), (i, j)))
+                    if i + 1 < rows:
+                        candidates.add(((i, j), (i + 1, j)))
+            for j in self._dirty_cols:
+                for i in range(rows):
+                    if i + 1 < rows:
+                        candidates.add(((i, j), (i + 1, j)))
+                    if j > 0:
+                        candidates.add(((i, j - 1), (i, j)))
+                    if j + 1 < cols:
+                        candidates.add(((i, j), (i, j + 1)))
+        self._dirty_rows.clear()
+        self._dirty_cols.clear()
+        
+        legal = self._legal_moves
+        for move in candidates:
+            (i1, j1), (i2, j2) = move
+            if self.swap_makes_match(i1, j1, i2, j2):
+                legal.add(move)
             else:
-                for i, j in self.matches:
-                    current_tile = self.plane.get_tile(i, j)
-                    available_types = list(CANDY_TYPES)
-                    
-                    if i > 1 and self.plane.get_tile(i-1, j) and self.plane.get_tile(i-2, j):
-                        if (self.plane.get_tile(i-1, j).candy_type == 
-                            self.plane.get_tile(i-2, j).candy_type and 
-                            self.plane.get_tile(i-1, j).candy_type in available_types):
-                            available_types.remove(self.plane.get_tile(i-1, j).candy_type)
-                            
-                    if j > 1 and self.plane.get_tile(i, j-1) and self.plane.get_tile(i, j-2):
-                        if (self.plane.get_tile(i, j-1).candy_type == 
-                            self.plane.get_tile(i, j-2).candy_type and 
-                            self.plane.get_tile(i, j-1).candy_type in available_types):
-                            available_types.remove(self.plane.get_tile(i, j-1).candy_type)
-                    
-                    if available_types:
-                        current_tile.candy_type = random.choice(available_types)
-                    else:
-                        current_tile.candy_type = random.choice(CANDY_TYPES)
+                legal.discard(move)
+        return sorted(legal)
+    
+    # Marks a cell as changed for the legal move index
+    def _touch(self, i, j):
+        if self._legal_moves is not None:
+            self._dirty_rows.add(i)
+            self._dirty_cols.add(j)
+    
+    # Returns (cells, selected) where cells is a row-major tuple of candy types
+    def get_state(self):
+        grid = self.plane
+        cells = []
+        for i in range(grid.i_length):
+            for j in range(grid.j_length):
+                tile = grid.get_tile(i, j)
+                cells.append(tile.candy_type if tile else None)
+        
+        return tuple(cells), self.selected
+    
+    def set_state(self, cells, selected, matches=()):
+        grid = self.plane
+        cols = grid.j_length
+        for i in range(grid.i_length):
+            for j in range(cols):
+                candy_type = cells[i * cols + j]
+                grid.set_tile(i, j, CandyTile.of(candy_type) if candy_type else None)
+        
+        self.selected = tuple(selected) if selected else None
+        self.matches = list(matches)
+        self._legal_moves = None
+        if self.bitboards:
+            self.bitboards.rebuild(grid)
+    
+    # Zobrist hash of the candies plus the selection
+    def state_hash(self):
+        value = super().state_hash()
+        if not self.selected:
+            return value
+        return value ^ zobrist_keys.key('selected', *self.selected)
+    
+    # The selected candy as a tile that knows its position, for callers using getLocation()
+    @property
+    def selected_tile(self):
+        return self.plane.locate(*self.selected) if self.selected else None
+    
+    # Takes a located tile such as plane.locate(i, j); a bare grid tile raises ValueError
+    @selected_tile.setter
+    def selected_tile(self, tile):
+        if tile is None:
+            self.selected = None
+        else:
+            location = tile.getLocation()
+            self.selected = (location.getI_Location(), location.getJ_Location())
+    
+    # Checks whether swapping two cells would create a match, leaving the board unchanged
+    def swap_makes_match(self, i1, j1, i2, j2):
+        tile1 = self.plane.get_tile(i1, j1)
+        tile2 = self.plane.get_tile(i2, j2)
+        if not tile1 or not tile2 or tile1.candy_type == tile2.candy_type:
+            return False
+        
+        self.plane.set_tile(i1, j1, tile2)
+        self.plane.set_tile(i2, j2, tile1)
+        matched = bool(self.find_matches_at([(i1, j1), (i2, j2)]))
+        self.plane.set_tile(i1, j1, tile1)
+        self.plane.set_tile(i2, j2, tile2)
+        return matched
                 
-                self.matches = []
-
     def select_tile(self, i, j):
         if (0 <= i < self.plane.i_length and 
             0 <= j < self.plane.j_length):
             
             tile = self.plane.get_tile(i, j)
             if tile:
-                if self.selected_tile:
-                    selected_location = self.selected_tile.getLocation()
-                    selected_i = selected_location.getI_Location()
-                    selected_j = selected_location.getJ_Location()
+                if self.selected:
+                    selected_i, selected_j = self.selected
                     
                     if ((abs(selected_i - i) == 1 and selected_j == j) or
                         (abs(selected_j - j) == 1 and selected_i == i)):
                         return self.swap_tiles(selected_i, selected_j, i, j)
                     else:
-                        self.selected_tile = tile
+                        self.selected = (i, j)
                 else:
-                    self.selected_tile = tile
+                    self.selected = (i, j)
                 return True
         return False
                 
@@ -91,19 +344,41 @@ class CandyCrushBoard(GameBoard):
         if not tile1 or not tile2:
             return False
             
-        tile1.candy_type, tile2.candy_type = tile2.candy_type, tile1.candy_type
+        self._swap_types(i1, j1, i2, j2, tile1, tile2)
         
-        self.find_matches()
+        if self.bitboards:
+            self.find_matches()
+        else:
+            # The board is match-free before a swap, so only runs through the two cells can match
+            self.matches = list(self.find_matches_at([(i1, j1), (i2, j2)]))
         
         if not self.matches:
-            tile1.candy_type, tile2.candy_type = tile2.candy_type, tile1.candy_type
-            self.selected_tile = None
+            self._swap_types(i1, j1, i2, j2, tile2, tile1)
+            self.selected = None
             return False
             
-        self.selected_tile = None
+        self.selected = None
         return True
+    
+    # Swaps the two cells' tiles; tile1 and tile2 are the tiles currently at each cell
+    def _swap_types(self, i1, j1, i2, j2, tile1, tile2):
+        self.plane.set_tile(i1, j1, tile2)
+        self.plane.set_tile(i2, j2, tile1)
+        type1, type2 = tile1.candy_type, tile2.candy_type
+        self._track(i1, j1, type1, type2)
+        self._track(i2, j2, type2, type1)
+    
+    # Keeps the per-type bitboards and the legal move index in step with a cell's candy type
+    def _track(self, i, j, old_type, new_type):
+        self._touch(i, j)
+        if self.bitboards:
+            self.bitboards.set(i, j, old_type, new_type)
             
     def find_matches(self):
+        if self.bitboards:
+            self.matches = self.bitboards.cells(self.bitboards.match_mask())
+            return len(self.matches) > 0
+        
         self.matches = []
         
         for i in range(self.plane.i_length):
@@ -153,49 +428,120 @@ class CandyCrushBoard(GameBoard):
         self.matches = list(set(self.matches))
         return len(self.matches) > 0
 
+    # Returns the matched cells on the row and column runs through the given cells
+    def find_matches_at(self, cells):
+        grid = self.plane
+        rows, cols = grid.i_length, grid.j_length
+        found = set()
+        
+        for i, j in cells:
+            tile = grid.get_tile(i, j)
+            if not tile:
+                continue
+            candy_type = tile.candy_type
+            
+            left = j
+            while left > 0 and self._same_type(i, left - 1, candy_type):
+                left -= 1
+            right = j
+            while right < cols - 1 and self._same_type(i, right + 1, candy_type):
+                right += 1
+            if right - left >= 2:
+                found.update((i, k) for k in range(left, right + 1))
+            
+            top = i
+            while top > 0 and self._same_type(top - 1, j, candy_type):
+                top -= 1
+            bottom = i
+            while bottom < rows - 1 and self._same_type(bottom + 1, j, candy_type):
+                bottom += 1
+            if bottom - top >= 2:
+                found.update((k, j) for k in range(top, bottom + 1))
+        
+        return found
+
+    def _same_type(self, i, j, candy_type):
+        tile = self.plane.get_tile(i, j)
+        return tile is not None and tile.candy_type == candy_type
+
     def remove_matches(self):
         if not self.matches:
             return 0
             
         match_count = len(self.matches)
         
+        touched = set()
         for i, j in self.matches:
             self.plane.clear_tile(i, j)
+            touched.add(j)
         
-        self.apply_gravity()
-        self.fill_empty_spaces()
-        self.matches = []
+        changed = self.collapse_columns(sorted(touched))
+        self.last_changed_cells = changed
         
-        self.find_matches()
+        if self.bitboards:
+            for j in touched:
+                self.bitboards.sync_column(self.plane, j)
+            self.find_matches()
+        else:
+            self.matches = list(self.find_matches_at(changed))
         
         return match_count
     
-    def apply_gravity(self):
-        for j in range(self.plane.j_length):
-            for i in range(self.plane.i_length - 1, -1, -1):
-                if not self.plane.get_tile(i, j):
-                    for k in range(i - 1, -1, -1):
-                        above_tile = self.plane.get_tile(k, j)
-                        if above_tile:
-                            self.plane.set_tile(i, j, above_tile)
-                            location = above_tile.getLocation()
-                            location.setI_Location(i)
-                            self.plane.clear_tile(k, j)
-                            i -= 1
+    # Drops surviving candies and refills the top of each given column in one sweep,
+    # returning the cells that received a moved or newly spawned candy
+    def collapse_columns(self, columns):
+        grid = self.plane
+        if isinstance(grid, ArrayGrid):
+            changed = self._collapse_codes(grid, columns)
+            for i, j in changed:
+                self._touch(i, j)
+            return changed
+        changed = set()
+        
+        for j in columns:
+            write = grid.i_length - 1
+            for i in range(grid.i_length - 1, -1, -1):
+                tile = grid.get_tile(i, j)
+                if tile:
+                    if write != i:
+                        grid.set_tile(write, j, tile)
+                        changed.add((write, j))
+                    write -= 1
+            
+            for i in range(write + 1):
+                grid.set_tile(i, j, CandyTile.of(self.rng.choice(CANDY_TYPES)))
+                changed.add((i, j))
+        
+        for i, j in changed:
+            self._touch(i, j)
+        return changed
     
-    def fill_empty_spaces(self):
-        for j in range(self.plane.j_length):
-            for i in range(self.plane.i_length):
-                if not self.plane.get_tile(i, j):
-                    location = Location(i, j)
-                    tile = CandyTile(location)
-                    self.plane.set_tile(i, j, tile)
+    # collapse_columns on a packed grid: each column is read and written as one code slice
+    def _collapse_codes(self, grid, columns):
+        rows = grid.i_length
+        codes_of = grid.codes
+        changed = set()
+        
+        for j in columns:
+            column = grid.get_column_codes(j)
+            kept = [i for i in range(rows) if column[i]]
+            fresh = rows - len(kept)
+            new_column = [codes_of[self.rng.choice(CANDY_TYPES)] for _ in range(fresh)]
+            new_column.extend(column[i] for i in kept)
+            grid.set_column_codes(j, new_column)
+            
+            changed.update((i, j) for i in range(fresh))
+            changed.update((fresh + k, j) for k, i in enumerate(kept) if i != fresh + k)
+        return changed
 
 class CandyCrush(Game):
     # Main game controller handling scoring timers and multiplayer
-    def __init__(self):
-        super().__init__()
-        self.board = CandyCrushBoard()
+    def __init__(self, clock=None, rng=None, use_bitboard: bool = False, packed_grid: bool = False):
+        super().__init__(clock)
+        self.rng = rng
+        self.use_bitboard = use_bitboard
+        self.packed_grid = packed_grid
+        self.board = self._new_board()
         self._running = False
         self.score = 0
         self.level = 1
@@ -206,6 +552,10 @@ class CandyCrush(Game):
         self.active_player_index = 0
         self.last_update_time = 0
         
+    def _new_board(self, rows=9, cols=9):
+        return CandyCrushBoard(rows, cols, use_bitboard=self.use_bitboard, rng=self.rng,
+                               packed_grid=self.packed_grid)
+        
     def add_player(self, player):
         self.players.append(player)
         self.player_timers[player] = self.default_time
@@ -241,7 +591,7 @@ class CandyCrush(Game):
         
         if not self.board.plane.get_tile(0, 0):
             print("Initializing game board")
-            self.board = CandyCrushBoard()
+            self.board = self._new_board()
         else:
             # Check for empty cells
             empty_cells = 0
@@ -252,14 +602,15 @@ class CandyCrush(Game):
             
             if empty_cells > 0:
                 print(f"Fixing board - found {empty_cells} empty cells")
-                self.board = CandyCrushBoard()
+                self.board = self._new_board()
         
         # One final check
         if not self.board.plane.get_tile(0, 0):
             print("Emergency board initialization")
-            self.board = CandyCrushBoard()
+            self.board = self._new_board()
             self.board.populate_board()
         
+        self.record_change('reset')
         self.notify_observers()
         print("Candy Crush started with timer system")
 
@@ -272,6 +623,8 @@ class CandyCrush(Game):
     def stop(self):
         self._running = False
         self.timer.stop()
+        # No more ticks will come, so hand throttled and coalescing observers what is left
+        self.notify_observers(force=True)
         print("Candy Crush stopped")
 
     def handle_input(self, i, j):
@@ -283,12 +636,18 @@ class CandyCrush(Game):
         # Special case for testing
         if i == 99 and j == 99:
             if self.switch_player():
+                self.record_change('player', self.active_player_index)
                 active_player = self.get_active_player()
                 if active_player:
                     print(f"Active player: {active_player.name}")
             return True
             
-        if self.board.select_tile(i, j):
+        selected = self.board.selected
+        moved = self.board.select_tile(i, j)
+        if self.board.selected != selected:
+            self.record_change('selection', self.board.selected)
+        
+        if moved:
             print(f"Selected candy at ({i}, {j})")
             
             if self.board.matches:
@@ -303,27 +662,39 @@ class CandyCrush(Game):
                 if len(self.players) > 1:
                     print(f"Switching players after move")
                     self.switch_player()
+                    self.record_change('player', self.active_player_index)
                     
                 return True
         return False
     
     def process_matches(self):
+        changed = set(self.board.matches)
         matches = self.board.remove_matches()
+        changed |= self.board.last_changed_cells
         points = matches * 10 
         total_match_count = matches
         
         cascade_multiplier = 1
         while self.board.matches:
             cascade_multiplier += 1
+            changed.update(self.board.matches)
             additional_matches = self.board.remove_matches()
+            changed |= self.board.last_changed_cells
             total_match_count += additional_matches
             points += additional_matches * 10 * cascade_multiplier
         
         print(f"Found {total_match_count} matches total")
         
+        if self.board.is_dead():
+            print("No moves left, reshuffling the board")
+            self.board.reshuffle()
+            changed |= self.board.last_changed_cells
+        self.record_change('cells', frozenset(changed))
+        
         self.score += points
         
         self.level = 1 + (self.score // 1000)
+        self.record_change('score', self.score)
         
         if total_match_count > 0 and len(self.players) > 0:
             print(f"Adjusting timers for {len(self.players)} players")
@@ -340,11 +711,13 @@ class CandyCrush(Game):
                 if opponent:
                     self.player_timers[opponent] = max(1, self.player_timers[opponent] - time_adjustment)
                     print(f"Reduced {opponent.name}'s timer by {time_adjustment} second")
+            self.record_change('timer')
         
         return total_match_count, points
     
     def end_game(self):
         self.game_over = True
+        self.record_change('game_over')
         self.stop()
         
         print(f"Game Over!")
@@ -362,7 +735,11 @@ class CandyCrush(Game):
         
         active_player = self.get_active_player()
         if active_player:
+            time_left = self.player_timers[active_player]
             self.player_timers[active_player] -= elapsed
+            # Timers are shown in whole seconds, so only report when that changes
+            if int(time_left) != int(self.player_timers[active_player]):
+                self.record_change('timer', self.active_player_index)
             
             if self.player_timers[active_player] <= 0:
                 self.player_timers[active_player] = 0
@@ -379,6 +756,44 @@ class CandyCrush(Game):
         
         self.notify_observers()
         
+    def snapshot(self):
+        cells, selected = self.board.get_state()
+        return CandyCrushSnapshot(
+            rows=self.board.plane.i_length,
+            cols=self.board.plane.j_length,
+            cells=cells,
+            selected=selected,
+            matches=tuple(self.board.matches),
+            score=self.score,
+            level=self.level,
+            player_timers=tuple(self.player_timers.get(player, self.default_time) for player in self.players),
+            game_over=self.game_over,
+            running=self._running,
+            active_player_index=self.active_player_index,
+            last_update_time=self.last_update_time,
+            player_scores=tuple(player.score for player in self.players),
+            timer=self.timer.get_state(),
+            rng_state=self.board.rng.getstate(),
+        )
+    
+    def restore(self, snapshot):
+        if (self.board.plane.i_length, self.board.plane.j_length) != (snapshot.rows, snapshot.cols):
+            self.board = self._new_board(snapshot.rows, snapshot.cols)
+        self.board.set_state(snapshot.cells, snapshot.selected, snapshot.matches)
+        self.board.rng.setstate(snapshot.rng_state)
+        
+        self.score = snapshot.score
+        self.level = snapshot.level
+        self.game_over = snapshot.game_over
+        self._running = snapshot.running
+        self.active_player_index = snapshot.active_player_index
+        for player, time_left, score in zip(self.players, snapshot.player_timers, snapshot.player_scores):
+            self.player_timers[player] = time_left
+            player.update_score(score - player.score)
+        self.last_update_time = snapshot.last_update_time
+        self.timer.set_state(snapshot.timer)
+        self.record_change('reset')
+        
     def get_display_data(self):
         player_data = []
         for idx, player in enumerate(self.players):
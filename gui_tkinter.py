@@ -13,6 +13,205 @@ def restart_to_main_menu():
     
     subprocess.Popen([python, main_script])
 
+# Retained-mode board drawing: every cell gets one background rectangle and, unless
+# foreground is None, one foreground "oval" or rectangle, created once per layout; each
+# frame only reconfigures the cells whose style changed. A style is
+# (fill, outline, width, foreground fill or None).
+class BoardRenderer:
+    def __init__(self, canvas, foreground="oval", inset=0.1, grid_line_color=None):
+        self.canvas = canvas
+        self.foreground = foreground
+        self.inset = inset
+        self.grid_line_color = grid_line_color
+        self.tag = f"board{id(self)}"
+        self._layout = None
+        self._items = {}
+        self._styles = {}
+
+    def draw(self, rows, cols, cell_size, start_x, start_y, style_of):
+        layout = (rows, cols, cell_size, start_x, start_y)
+        if layout != self._layout:
+            self._build(layout)
+        
+        itemconfig = self.canvas.itemconfig
+        styles = self._styles
+        for i in range(rows):
+            for j in range(cols):
+                style = style_of(i, j)
+                if styles.get((i, j)) == style:
+                    continue
+                styles[(i, j)] = style
+                background, foreground = self._items[(i, j)]
+                fill, outline, width, foreground_fill = style
+                itemconfig(background, fill=fill, outline=outline, width=width)
+                if foreground is None:
+                    continue
+                if foreground_fill:
+                    itemconfig(foreground, fill=foreground_fill, state="normal")
+                else:
+                    itemconfig(foreground, state="hidden")
+
+    # Forces every cell to be redrawn on the next frame
+    def invalidate(self):
+        self._layout = None
+
+    def _build(self, layout):
+        rows, cols, cell_size, start_x, start_y = layout
+        canvas = self.canvas
+        canvas.delete(self.tag)
+        self._layout = layout
+        self._items = {}
+        self._styles = {}
+        
+        if self.grid_line_color:
+            for i in range(rows + 1):
+                y = start_y + i * cell_size
+                canvas.create_line(start_x, y, start_x + cols * cell_size, y,
+                                   fill=self.grid_line_color, tags=self.tag)
+            for j in range(cols + 1):
+                x = start_x + j * cell_size
+                canvas.create_line(x, start_y, x, start_y + rows * cell_size,
+                                   fill=self.grid_line_color, tags=self.tag)
+        
+        if self.foreground is None:
+            create_foreground = None
+        elif self.foreground == "oval":
+            create_foreground = canvas.create_oval
+        else:
+            create_foreground = canvas.create_rectangle
+        offset = cell_size * self.inset
+        for i in range(rows):
+            for j in range(cols):
+                x = start_x + j * cell_size
+                y = start_y + i * cell_size
+                background = canvas.create_rectangle(x, y, x + cell_size, y + cell_size,
+                                                     fill="", outline="", tags=self.tag)
+                foreground = None
+                if create_foreground:
+                    foreground = create_foreground(x + offset, y + offset,
+                                                   x + cell_size - offset, y + cell_size - offset,
+                                                   fill="", outline="black", state="hidden", tags=self.tag)
+                self._items[(i, j)] = (background, foreground)
+
+# Paints Tetris cells: locked and falling blocks in their color, the ghost piece as an outline.
+# The context passed to it is the set of ghost cells.
+class TetrisCellPainter:
+    EMPTY = ("black", "gray", 1, None)
+    GHOST = ("black", "white", 1, None)
+
+    def __init__(self):
+        self._styles = {}
+
+    def __call__(self, tile, i, j, ghost):
+        if tile:
+            color = getattr(tile, 'color', "cyan")
+            style = self._styles.get(color)
+            if style is None:
+                style = self._styles[color] = (color, "black", 1, None)
+            return style
+        if ghost and (i, j) in ghost:
+            return self.GHOST
+        return self.EMPTY
+
+# Paints candies as ovals over a cell background that marks the cursor and selection.
+# The context is (cursor, selected) as (i, j) pairs or None. Styles are
+# (fill, outline, width) backgrounds; cursor_first decides which mark wins on one cell.
+class CandyCellPainter:
+    def __init__(self, colors, plain, cursor, selected, cursor_first=True,
+                 default_color="gray", mark_empty=True):
+        self.colors = colors
+        self.plain = plain
+        self.cursor = cursor
+        self.selected = selected
+        self.cursor_first = cursor_first
+        self.default_color = default_color
+        self.mark_empty = mark_empty
+        self._styles = {}
+
+    def __call__(self, tile, i, j, context):
+        cursor, selected = context if context else (None, None)
+        candy_type = getattr(tile, 'candy_type', None) if tile else None
+        
+        background = self.plain
+        if tile or self.mark_empty:
+            marks = [(cursor, self.cursor), (selected, self.selected)]
+            if not self.cursor_first:
+                marks.reverse()
+            for cell, style in marks:
+                if cell == (i, j):
+                    background = style
+                    break
+        
+        key = (background, candy_type)
+        style = self._styles.get(key)
+        if style is None:
+            color = self.colors.get(candy_type, self.default_color) if candy_type else None
+            style = self._styles[key] = background + (color,)
+        return style
+
+class BoardView(tk.Canvas):
+    """
+    Canvas that draws any tmge.Grid through a pluggable cell painter.
+
+    ``painter(tile, i, j, context)`` returns a cell style for BoardRenderer.
+    The cell size and board offsets are cached and only recomputed when the
+    canvas is resized or the grid's dimensions change.
+    """
+    def __init__(self, parent, painter, grid_line_color=None, foreground="oval", inset=0.1, **options):
+        super().__init__(parent, **options)
+        self.painter = painter
+        self.renderer = BoardRenderer(self, foreground, inset, grid_line_color)
+        # (cell_size, start_x, start_y), or None until the next render
+        self.layout = None
+        self._size = None
+        self._dims = None
+        self._last = None
+        self.bind("<Configure>", self._on_configure)
+
+    def render(self, grid, context=None):
+        rows, cols = grid.i_length, grid.j_length
+        if self.layout is None or self._dims != (rows, cols):
+            self._dims = (rows, cols)
+            self.layout = self._compute_layout(rows, cols)
+        self._last = (grid, context)
+        
+        cell_size, start_x, start_y = self.layout
+        painter = self.painter
+        get_tile = grid.get_tile
+        self.renderer.draw(rows, cols, cell_size, start_x, start_y,
+                           lambda i, j: painter(get_tile(i, j), i, j, context))
+
+    # Forgets the cached layout, cell styles and last grid, e.g. when a new game takes over
+    # the view, so the next render repaints every cell
+    def reset(self):
+        self.layout = None
+        self._last = None
+        self.renderer.invalidate()
+
+    # Grid cell under a canvas point, or None outside the board
+    def cell_at(self, x, y):
+        if self.layout is None:
+            return None
+        cell_size, start_x, start_y = self.layout
+        rows, cols = self._dims
+        i = (y - start_y) // cell_size
+        j = (x - start_x) // cell_size
+        if 0 <= i < rows and 0 <= j < cols:
+            return (int(i), int(j))
+        return None
+
+    def _on_configure(self, event):
+        self._size = (event.width, event.height)
+        self.layout = None
+        if self._last:
+            self.render(*self._last)
+
+    def _compute_layout(self, rows, cols):
+        # Before the first <Configure> the canvas has no real size yet, so use the requested one
+        width, height = self._size if self._size else (self.winfo_reqwidth(), self.winfo_reqheight())
+        cell_size = max(1, min(width // cols, height // rows))
+        return (cell_size, (width - cell_size * cols) // 2, (height - cell_size * rows) // 2)
+
 # Main GUI class for split-screen multiplayer manages two game instances side by side
 class SplitScreenMultiplayerGUI(tk.Tk):
     def __init__(self, game_type, player1, player2):
@@ -134,8 +333,9 @@ class SplitScreenMultiplayerGUI(tk.Tk):
         self.player1_game.add_player(self.player1)
         self.player2_game.add_player(self.player2)
         
-        self.player1_game.register_observer(self.player1_gui)
-        self.player2_game.register_observer(self.player2_gui)
+        # Both boards redraw at most once per frame, when update_game flushes them
+        self.player1_game.register_observer(self.player1_gui, coalesce=True)
+        self.player2_game.register_observer(self.player2_gui, coalesce=True)
         
         self.player1_game.start()
         self.player2_game.start()
@@ -236,6 +436,10 @@ class SplitScreenMultiplayerGUI(tk.Tk):
             if hasattr(self.player2_game, 'update'):
                 self.player2_game.update()
             
+            for game in (self.player1_game, self.player2_game):
+                if hasattr(game, 'flush_observers'):
+                    game.flush_observers()
+            
             if self.player1:
                 self.player1_score_var.set(f"Score: {self.player1.score}")
             if self.player2:
@@ -312,7 +516,7 @@ class PlayerTetrisGUI(tk.Frame, Observer):
         self.board_frame = tk.Frame(self, bd=2, relief=tk.SUNKEN)
         self.board_frame.pack(fill=tk.BOTH, expand=True)
         
-        self.board_canvas = tk.Canvas(self.board_frame, bg="black", width=250, height=500)
+        self.board_canvas = BoardView(self.board_frame, TetrisCellPainter(), foreground=None, bg="black", width=250, height=500)
         self.board_canvas.pack(fill=tk.BOTH, expand=True)
         
         self.next_frame = tk.Frame(self)
@@ -350,39 +554,7 @@ class PlayerTetrisGUI(tk.Frame, Observer):
         if not board:
             return
             
-        grid = board.plane
-        rows, cols = grid.i_length, grid.j_length
-        
-        canvas_width = self.board_canvas.winfo_width()
-        canvas_height = self.board_canvas.winfo_height()
-        
-        if canvas_width <= 1 or canvas_height <= 1:
-            canvas_width = 250  
-            canvas_height = 500  
-            self.board_canvas.update_idletasks()
-        
-        cell_size = min(canvas_width // cols, canvas_height // rows)
-        
-        total_grid_width = cell_size * cols
-        total_grid_height = cell_size * rows
-        start_x = (canvas_width - total_grid_width) // 2
-        start_y = (canvas_height - total_grid_height) // 2
-        
-        self.board_canvas.delete("all")
-        
-        for i in range(rows):
-            for j in range(cols):
-                x1 = start_x + j * cell_size
-                y1 = start_y + i * cell_size
-                x2 = x1 + cell_size
-                y2 = y1 + cell_size
-                
-                tile = grid.get_tile(i, j)
-                if tile:
-                    color = tile.color if hasattr(tile, 'color') else "cyan"
-                    self.board_canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black")
-                else:
-                    self.board_canvas.create_rectangle(x1, y1, x2, y2, fill="black", outline="gray")
+        self.board_canvas.render(board.plane, set(data.get('ghost', ())))
         
         next_piece = data.get('next_piece')
         if next_piece:
@@ -402,8 +574,6 @@ class PlayerTetrisGUI(tk.Frame, Observer):
                 x2 = x1 + preview_cell_size
                 y2 = y1 + preview_cell_size
                 self.next_canvas.create_rectangle(x1, y1, x2, y2, fill=tile.color, outline="black")
-        
-        self.update_idletasks()
     
     def handle_key(self, key):
         """Handle keyboard input"""
@@ -418,6 +588,7 @@ class PlayerCandyCrushGUI(tk.Frame, Observer):
         self.player = player
         self.is_player1 = is_player1
         self.game = None
+        self._redraw_pending = None
         
         self.game_frame = self
         
@@ -437,7 +608,6 @@ class PlayerCandyCrushGUI(tk.Frame, Observer):
         self.cursor_j = 0
         self.grid_rows = 9  
         self.grid_cols = 9  
-        self.cell_size = 30 
         self.cursor_speed = 1  
         self.key_pressed = False  
         
@@ -519,8 +689,19 @@ class PlayerCandyCrushGUI(tk.Frame, Observer):
         )
         board_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 15), padx=10)
         
-        self.board_canvas = tk.Canvas(
+        painter = CandyCellPainter(
+            self.candy_colors,
+            plain=("", "", 1),
+            cursor=("#CCFFCC", "#00FF00", 2),
+            selected=("#FFFF00", "#FF0000", 2),
+            cursor_first=False,
+            default_color="#DDDDDD",
+            mark_empty=False
+        )
+        self.board_canvas = BoardView(
             board_frame, 
+            painter,
+            grid_line_color="#CCCCCC",
             bg="#fff8e1",  
             width=400, 
             height=400, 
@@ -622,7 +803,13 @@ class PlayerCandyCrushGUI(tk.Frame, Observer):
     
     def update(self, subject):
         self.game = subject
-        self.after(100, self.update_display)
+        # Keep at most one redraw queued however many notifications arrive
+        if self._redraw_pending is None:
+            self._redraw_pending = self.after(100, self._redraw)
+    
+    def _redraw(self):
+        self._redraw_pending = None
+        self.update_display()
     
     def update_display(self):
         if not self.game:
@@ -651,84 +838,17 @@ class PlayerCandyCrushGUI(tk.Frame, Observer):
             
         grid = board.plane
         rows, cols = grid.i_length, grid.j_length
-        
-        canvas_width = self.board_canvas.winfo_width()
-        canvas_height = self.board_canvas.winfo_height()
-        
-        if canvas_width <= 1 or canvas_height <= 1:
-            canvas_width = 300  
-            canvas_height = 300  
-            self.board_canvas.update_idletasks()
-            
-        self.cell_size = min(canvas_width // cols, canvas_height // rows)
-        
-        total_grid_width = self.cell_size * cols
-        total_grid_height = self.cell_size * rows
-        start_x = (canvas_width - total_grid_width) // 2
-        start_y = (canvas_height - total_grid_height) // 2
-        
         self.grid_rows = rows
         self.grid_cols = cols
         
-        self.board_canvas.delete("all")
-        
-        for i in range(rows + 1):
-            y = start_y + i * self.cell_size
-            self.board_canvas.create_line(
-                start_x, y, 
-                start_x + cols * self.cell_size, y, 
-                fill="#CCCCCC"
-            )
-        
-        for j in range(cols + 1):
-            x = start_x + j * self.cell_size
-            self.board_canvas.create_line(
-                x, start_y, 
-                x, start_y + rows * self.cell_size, 
-                fill="#CCCCCC"
-            )
-        
-        has_tiles = False  
-        for i in range(rows):
-            for j in range(cols):
-                x = start_x + j * self.cell_size
-                y = start_y + i * self.cell_size
-                
-                tile = grid.get_tile(i, j)
-                if tile:
-                    has_tiles = True  
-                    candy_type = tile.candy_type
-                    color = self.candy_colors.get(candy_type, "#DDDDDD")
-                    
-                    if i == self.cursor_i and j == self.cursor_j:
-                        self.board_canvas.create_rectangle(
-                            x, y, x + self.cell_size, y + self.cell_size,
-                            fill="#CCFFCC", outline="#00FF00", width=2
-                        )
-                    
-                    if board.selected_tile and board.selected_tile == tile:
-                        self.board_canvas.create_rectangle(
-                            x, y, x + self.cell_size, y + self.cell_size,
-                            fill="#FFFF00", outline="#FF0000", width=2
-                        )
-                    
-                    size_factor = 0.8  
-                    candy_size = self.cell_size * size_factor
-                    offset = (self.cell_size - candy_size) / 2
-                    
-                    self.board_canvas.create_oval(
-                        x + offset, y + offset,
-                        x + offset + candy_size, y + offset + candy_size,
-                        fill=color, outline="black"
-                    )
+        self.board_canvas.render(grid, ((self.cursor_i, self.cursor_j), board.selected))
         
+        has_tiles = any(grid.get_tile(i, j) for i in range(rows) for j in range(cols))
         if not has_tiles and self.game:
             print("No tiles found during rendering, attempting to repopulate board")
             if hasattr(self.game, 'board') and hasattr(self.game.board, 'populate_board'):
                 self.game.board.populate_board()
                 self.after(500, self.update_display)
-        
-        self.update_idletasks()
     
     def handle_key(self, key):
         if not self.game or not self.game._running:
@@ -753,14 +873,9 @@ class PlayerCandyCrushGUI(tk.Frame, Observer):
         if not self.game or not self.game._running:
             return
             
-        if hasattr(self, 'grid_start_x') and hasattr(self, 'grid_start_y'):
-            j = (event.x - self.grid_start_x) // self.cell_size
-            i = (event.y - self.grid_start_y) // self.cell_size
-        else:
-            j = event.x // self.cell_size
-            i = event.y // self.cell_size
-        
-        if 0 <= i < self.grid_rows and 0 <= j < self.grid_cols:
+        cell = self.board_canvas.cell_at(event.x, event.y)
+        if cell:
+            i, j = cell
             self.cursor_i = i
             self.cursor_j = j
             self.update_display()
@@ -1012,6 +1127,8 @@ class TkinterGUI(tk.Tk, Observer):
         
         game_type = self.game.__class__
         self.game = game_type()
+        if hasattr(self, 'board_canvas'):
+            self.board_canvas.reset()
         
         self.game.register_observer(self)
         
@@ -1115,7 +1232,7 @@ class TetrisGUI(TkinterGUI):
         self.board_frame = tk.Frame(self.display_frame, bd=3, relief=tk.RIDGE, bg="#333333")
         self.board_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
         
-        self.board_canvas = tk.Canvas(self.board_frame, bg="#000000", bd=0, highlightthickness=0)
+        self.board_canvas = BoardView(self.board_frame, TetrisCellPainter(), foreground=None, bg="#000000", bd=0, highlightthickness=0)
         self.board_canvas.pack(fill=tk.BOTH, expand=True, padx=2, pady=2)
         
         self.info_frame = tk.Frame(self.display_frame, width=200, bg="#f5f5f5", relief=tk.GROOVE, bd=2)
@@ -1193,42 +1310,7 @@ Tab     : Switch player
         if not board:
             return
             
-        grid = board.plane
-        rows, cols = grid.i_length, grid.j_length
-        
-        canvas_width = self.board_canvas.winfo_width()
-        canvas_height = self.board_canvas.winfo_height()
-        
-        if canvas_width <= 1 or canvas_height <= 1:
-            self.board_canvas.update_idletasks()
-            return
-        
-        cell_size = min(canvas_width // cols, canvas_height // rows)
-        
-        total_grid_width = cell_size * cols
-        total_grid_height = cell_size * rows
-        start_x = (canvas_width - total_grid_width) // 2
-        start_y = (canvas_height - total_grid_height) // 2
-        
-        self.board_canvas.delete("all")
-        
-        for i in range(rows):
-            for j in range(cols):
-                x1 = start_x + j * cell_size
-                y1 = start_y + i * cell_size
-                x2 = x1 + cell_size
-                y2 = y1 + cell_size
-                
-                
-                tile = grid.get_tile(i, j)
-                if tile:
-                    if hasattr(tile, 'color'):
-                        color = tile.color
-                    else:
-                        color = "cyan"      
-                    self.board_canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="black")
-                else:
-                    self.board_canvas.create_rectangle(x1, y1, x2, y2, fill="black", outline="gray")
+        self.board_canvas.render(board.plane, set(data.get('ghost', ())))
         
         next_piece = data.get('next_piece')
         if next_piece:
@@ -1280,7 +1362,6 @@ class CandyCrushGUI(TkinterGUI):
         self.cursor_j = 0
         self.grid_rows = 9  
         self.grid_cols = 9  
-        self.cell_size = 30 
         
         self.setup_candycrush_ui()
         
@@ -1340,8 +1421,15 @@ class CandyCrushGUI(TkinterGUI):
         )
         board_frame.pack(fill=tk.BOTH, expand=True, pady=(0, 15), padx=10)
         
-        self.board_canvas = tk.Canvas(
+        painter = CandyCellPainter(
+            self.candy_colors,
+            plain=("#F8F8F8", "gray", 1),
+            cursor=("#F8F8F8", "red", 3),
+            selected=("#F8F8F8", "blue", 3)
+        )
+        self.board_canvas = BoardView(
             board_frame, 
+            painter,
             bg="#fff8e1",  
             width=400, 
             height=400, 
@@ -1487,66 +1575,9 @@ class CandyCrushGUI(TkinterGUI):
     def update_candy_display(self):
         if not self.board or not hasattr(self.board, 'plane'):
             return
-            
-        self.board_canvas.delete("all")
-        
-        canvas_width = self.board_canvas.winfo_width()
-        canvas_height = self.board_canvas.winfo_height()
-        
-        if canvas_width <= 1 or canvas_height <= 1:
-            canvas_width = 300
-            canvas_height = 300
-        
-        cell_size = min(canvas_width // self.grid_cols, canvas_height // self.grid_rows)
         
-        start_x = (canvas_width - (cell_size * self.grid_cols)) // 2
-        start_y = (canvas_height - (cell_size * self.grid_rows)) // 2
-        
-        for i in range(self.grid_rows):
-            for j in range(self.grid_cols):
-                x = start_x + (j * cell_size)
-                y = start_y + (i * cell_size)
-                
-                if i == self.cursor_i and j == self.cursor_j:
-                    self.board_canvas.create_rectangle(
-                        x, y, x + cell_size, y + cell_size,
-                        fill="#F8F8F8", outline="red", width=3
-                    )
-                elif hasattr(self.board, 'selected_tile') and self.board.selected_tile:
-                    selected_loc = self.board.selected_tile.getLocation()
-                    selected_i, selected_j = selected_loc.getI_Location(), selected_loc.getJ_Location()
-                    
-                    if i == selected_i and j == selected_j:
-                        self.board_canvas.create_rectangle(
-                            x, y, x + cell_size, y + cell_size,
-                            fill="#F8F8F8", outline="blue", width=3
-                        )
-                    else:
-                        self.board_canvas.create_rectangle(
-                            x, y, x + cell_size, y + cell_size,
-                            fill="#F8F8F8", outline="gray"
-                        )
-                else:
-                    self.board_canvas.create_rectangle(
-                        x, y, x + cell_size, y + cell_size,
-                        fill="#F8F8F8", outline="gray"
-                    )
-                
-                tile = self.board.plane.get_tile(i, j)
-                if tile and hasattr(tile, 'candy_type'):
-                    color = self.candy_colors.get(tile.candy_type, "gray")
-                    
-                    size_factor = 0.8  
-                    candy_size = cell_size * size_factor
-                    offset = (cell_size - candy_size) / 2
-                    
-                    self.board_canvas.create_oval(
-                        x + offset, y + offset,
-                        x + offset + candy_size, y + offset + candy_size,
-                        fill=color, outline="black"
-                    )
-        
-        self.update_idletasks()
+        selected = getattr(self.board, 'selected', None)
+        self.board_canvas.render(self.board.plane, ((self.cursor_i, self.cursor_j), selected))
     
     def handle_key(self, key):
         if not self.game or not self.game._running:
@@ -1571,14 +1602,9 @@ class CandyCrushGUI(TkinterGUI):
         if not self.game or not self.game._running:
             return
             
-        if hasattr(self, 'grid_start_x') and hasattr(self, 'grid_start_y'):
-            j = (event.x - self.grid_start_x) // self.cell_size
-            i = (event.y - self.grid_start_y) // self.cell_size
-        else:
-            j = event.x // self.cell_size
-            i = event.y // self.cell_size
-        
-        if 0 <= i < self.grid_rows and 0 <= j < self.grid_cols:
+        cell = self.board_canvas.cell_at(event.x, event.y)
+        if cell:
+            i, j = cell
             self.cursor_i = i
             self.cursor_j = j
             self.update_display()
@@ -0,0 +1,178 @@
+# headless.py
+
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from tmge import Player, VirtualClock
+from tetris import Tetris
+from candycrush import CandyCrush
+
+GAMES = {
+    "tetris": Tetris,
+    "candycrush": CandyCrush,
+}
+
+class RandomTetrisAgent:
+    # Presses one random key per step
+    KEYS = ['LEFT', 'RIGHT', 'DOWN', 'UP', 'SPACE']
+
+    def __init__(self, rng=None):
+        self.rng = rng if rng else random.Random()
+
+    def __call__(self, game):
+        return [(self.rng.choice(self.KEYS),)]
+
+class RandomCandyCrushAgent:
+    # Selects a random cell and then one of its neighbours, i.e. one swap per step
+    def __init__(self, rng=None):
+        self.rng = rng if rng else random.Random()
+
+    def __call__(self, game):
+        grid = game.board.plane
+        i = self.rng.randrange(grid.i_length)
+        j = self.rng.randrange(grid.j_length)
+        di, dj = self.rng.choice([(0, 1), (1, 0), (0, -1), (-1, 0)])
+        i2 = min(max(i + di, 0), grid.i_length - 1)
+        j2 = min(max(j + dj, 0), grid.j_length - 1)
+        return [(i, j), (i2, j2)]
+
+class ScriptedAgent:
+    # Replays a fixed list of per-step inputs and stops the game when it runs out
+    def __init__(self, steps):
+        self._steps = iter(steps)
+
+    def __call__(self, game):
+        return next(self._steps, None)
+
+DEFAULT_AGENTS = {
+    Tetris: RandomTetrisAgent,
+    CandyCrush: RandomCandyCrushAgent,
+}
+
+class HeadlessRunner:
+    """
+    Drives any tmge.Game subclass without a GUI.
+
+    Each step asks the agent for a list of argument tuples, feeds each one to
+    ``game.handle_input`` and then advances the game with ``game.update()``.
+    An agent returning None ends the game early. With ``dt`` set, every game
+    runs on a VirtualClock that moves forward by ``dt`` seconds per step
+    instead of wall-clock time. ``game_options`` are extra keyword arguments for
+    the game class, e.g. ``{'use_bitboard': True}`` for CandyCrush.
+    """
+    def __init__(self, game_class, agent_factory=None, max_steps: int = 10000,
+                 player_names=("Player 1",), quiet: bool = True, dt: float = 0.033,
+                 game_options=None):
+        self.game_class = game_class
+        self.game_options = dict(game_options) if game_options else {}
+        self.agent_factory = agent_factory if agent_factory else DEFAULT_AGENTS[game_class]
+        self.max_steps = max_steps
+        self.dt = dt
+        self.player_names = player_names
+        self.quiet = quiet
+
+    def run_game(self, agent=None, rng=None) -> dict:
+        agent = agent if agent else self.agent_factory()
+        with self._output():
+            clock = VirtualClock() if self.dt else None
+            options = dict(self.game_options)
+            if clock:
+                options['clock'] = clock
+            if rng is not None:
+                options['rng'] = rng
+            game = self.game_class(**options)
+            players = [Player(name) for name in self.player_names]
+            for player in players:
+                game.add_player(player)
+            game.start()
+
+            steps = 0
+            while steps < self.max_steps and not getattr(game, 'game_over', False):
+                inputs = agent(game)
+                if inputs is None:
+                    break
+                for args in inputs:
+                    game.handle_input(*args)
+                if clock:
+                    clock.advance(self.dt)
+                game.update()
+                steps += 1
+
+            game.stop()
+
+        return {
+            'score': getattr(game, 'score', 0),
+            'level': getattr(game, 'level', 1),
+            'steps': steps,
+            'game_over': getattr(game, 'game_over', False),
+            'players': [(player.name, player.score) for player in players],
+        }
+
+    def run(self, games: int = 1, agent_factory=None) -> dict:
+        factory = agent_factory if agent_factory else self.agent_factory
+        results = []
+        start = time.perf_counter()
+        for _ in range(games):
+            results.append(self.run_game(factory()))
+        elapsed = time.perf_counter() - start
+
+        total_steps = sum(result['steps'] for result in results)
+        return {
+            'games': games,
+            'steps': total_steps,
+            'elapsed': elapsed,
+            'games_per_sec': games / elapsed if elapsed > 0 else float('inf'),
+            'steps_per_sec': total_steps / elapsed if elapsed > 0 else float('inf'),
+            'mean_score': sum(result['score'] for result in results) / games if games else 0,
+            'results': results,
+        }
+
+    @contextlib.contextmanager
+    def _output(self):
+        # The games print on every spawn and move, so silence them unless asked
+        if not self.quiet:
+            yield
+            return
+        with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+            yield
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run TMGE games without a display")
+    parser.add_argument("game", choices=sorted(GAMES))
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--max-steps", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--dt", type=float, default=0.033, help="simulated seconds per step")
+    parser.add_argument("--real-time", action="store_true", help="use the wall clock instead of --dt")
+    parser.add_argument("--verbose", action="store_true", help="keep the games' console output")
+    parser.add_argument("--bitboard", action="store_true", help="use the Candy Crush bitboard match kernel")
+    args = parser.parse_args(argv)
+    if args.bitboard and args.game != "candycrush":
+        parser.error("--bitboard only applies to candycrush")
+
+    game_class = GAMES[args.game]
+    agent_class = DEFAULT_AGENTS[game_class]
+    rng = random.Random(args.seed)
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    runner = HeadlessRunner(
+        game_class,
+        lambda: agent_class(random.Random(rng.random())),
+        max_steps=args.max_steps,
+        quiet=not args.verbose,
+        dt=None if args.real_time else args.dt,
+        game_options={'use_bitboard': True} if args.bitboard else None,
+    )
+    report = runner.run(args.games)
+
+    print(f"{args.game}: {report['games']} games, {report['steps']} steps in {report['elapsed']:.2f}s")
+    print(f"{report['games_per_sec']:.1f} games/sec, {report['steps_per_sec']:.0f} steps/sec")
+    print(f"Mean score: {report['mean_score']:.1f}")
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
+import sys
 from tmge import Menu, Player
 from tetris import Tetris
 from candycrush import CandyCrush
-from gui_tkinter import TetrisGUI, CandyCrushGUI, SplitScreenMultiplayerGUI
-import tkinter as tk
-from tkinter import ttk
 
 def main():
+    # Tk is only imported here so headless runs work on display-less machines
+    from gui_tkinter import TetrisGUI, CandyCrushGUI, SplitScreenMultiplayerGUI
+    import tkinter as tk
+    from tkinter import ttk
+
     # Initialize game menu and register available games
     menu = Menu()
     menu.register_game(Tetris)
@@ -323,4 +326,8 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "--headless":
+        import headless
+        headless.main(sys.argv[2:])
+    else:
+        main()
@@ -1,24 +1,214 @@
 # observer.py
 from abc import ABC, abstractmethod
+from collections import namedtuple
+import queue
+import threading
+import time
+
+# Changes recorded since the previous notification; changes is a tuple of (kind, data)
+ChangeSet = namedtuple('ChangeSet', ['version', 'changes'])
 
 class Observer(ABC):
     @abstractmethod
     def update(self, subject: "Subject") -> None:
         pass
 
+    # Receives the batched changes; by default a tick with no changes is skipped
+    def update_changes(self, subject: "Subject", change_set: ChangeSet) -> None:
+        if change_set.changes:
+            self.update(subject)
+
+
+# Delivery settings for one observer; pending holds changes merged since its last dispatch
+class Subscription:
+    def __init__(self, max_rate: float = None, coalesce: bool = False):
+        self.interval = 1.0 / max_rate if max_rate else 0.0
+        self.coalesce = coalesce
+        self.pending = None
+        self.last_sent = None
+
+    def merge(self, change_set: ChangeSet) -> None:
+        changes = change_set.changes
+        if self.pending is None or (changes and changes[0][0] == 'reset'):
+            # A reset supersedes whatever was still pending
+            if changes:
+                self.pending = change_set
+        else:
+            self.pending = ChangeSet(change_set.version, self.pending.changes + change_set.changes)
+
 
 class Subject(ABC):
     def __init__(self):
         self._observers = []
+        self._subscriptions = {}
+        self._changes = []
+        # Bumped once per notification that carries changes
+        self.version = 0
+        # Time source for max_rate throttling
+        self.notify_clock = time.monotonic
 
-    def register_observer(self, observer: Observer) -> None:
+    # max_rate caps dispatches per second to this observer: changes that arrive inside the
+    # interval wait and go out with a later notification once it has passed. With coalesce,
+    # notifications only queue changes and flush_observers() delivers them once per frame.
+    # Either way, notify_observers(force=True) delivers everything still waiting; games
+    # call it when they stop so the last changes are never stranded.
+    def register_observer(self, observer: Observer, max_rate: float = None, coalesce: bool = False) -> None:
         if observer not in self._observers:
             self._observers.append(observer)
+        if max_rate or coalesce:
+            self._subscriptions[observer] = Subscription(max_rate, coalesce)
+        else:
+            self._subscriptions.pop(observer, None)
 
     def remove_observer(self, observer: Observer) -> None:
         if observer in self._observers:
             self._observers.remove(observer)
+        self._subscriptions.pop(observer, None)
 
-    def notify_observers(self) -> None:
-        for obs in self._observers:
+    # Queues a typed delta (e.g. 'cells', 'piece', 'score') for the next notification.
+    # Nothing is kept while no one is registered, and a 'reset' (the whole state changed)
+    # drops everything queued before it
+    def record_change(self, kind: str, data=None) -> None:
+        if not self._observers:
+            return
+        if kind == 'reset':
+            self._changes = []
+        self._changes.append((kind, data))
+
+    def notify_observers(self, force: bool = False) -> None:
+        changes = tuple(self._changes)
+        self._changes = []
+        if changes:
+            self.version += 1
+        change_set = ChangeSet(self.version, changes)
+        for obs in list(self._observers):
+            subscription = self._subscriptions.get(obs)
+            if subscription is None:
+                self._dispatch(obs, change_set)
+                continue
+            subscription.merge(change_set)
+            if force or not subscription.coalesce:
+                self._deliver(obs, subscription, force)
+
+    # Delivers merged changes to coalescing and throttled observers; force ignores max_rate
+    def flush_observers(self, force: bool = False) -> None:
+        for obs, subscription in list(self._subscriptions.items()):
+            self._deliver(obs, subscription, force)
+
+    def _deliver(self, obs, subscription: Subscription, force: bool = False) -> None:
+        if subscription.pending is None:
+            return
+        now = self.notify_clock()
+        if (not force and subscription.last_sent is not None
+                and now - subscription.last_sent < subscription.interval):
+            return
+        change_set, subscription.pending = subscription.pending, None
+        subscription.last_sent = now
+        self._dispatch(obs, change_set)
+
+    def _dispatch(self, obs, change_set: ChangeSet) -> None:
+        update_changes = getattr(obs, 'update_changes', None)
+        if update_changes:
+            update_changes(self, change_set)
+        else:
             obs.update(self)
+
+
+class AsyncObserver(Observer):
+    """
+    Hands game snapshots to a slow handler on a worker thread so it never stalls
+    the game tick.
+
+    ``handler(snapshot, change_set)`` runs on the worker with the immutable
+    ``subject.snapshot()`` taken at notification time. The queue holds at most
+    ``maxsize`` items and ``policy`` decides what happens when the handler
+    falls behind: 'drop_oldest' discards the oldest queued snapshot once the
+    queue is full, 'block' makes the game wait, and 'sample' queues everything
+    until ``sample_above`` items are waiting (half the queue by default), then
+    only every ``sample_every``-th notification until the backlog shrinks,
+    dropping even those if the queue is full.
+    """
+    POLICIES = ('drop_oldest', 'block', 'sample')
+
+    def __init__(self, handler, maxsize: int = 64, policy: str = 'drop_oldest', sample_every: int = 2,
+                 sample_above: int = None):
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, expected one of {self.POLICIES}")
+        self.handler = handler
+        self.policy = policy
+        self.sample_every = max(1, sample_every)
+        if sample_above is None:
+            sample_above = max(1, maxsize // 2) if maxsize > 0 else float('inf')
+        self.sample_above = sample_above
+        self.dropped = 0
+        self.errors = 0
+        # Notifications seen since the backlog reached sample_above
+        self._backlogged = 0
+        self._queue = queue.Queue(maxsize)
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def update(self, subject: "Subject") -> None:
+        self._enqueue(subject, None)
+
+    def update_changes(self, subject: "Subject", change_set: ChangeSet) -> None:
+        if change_set.changes:
+            self._enqueue(subject, change_set)
+
+    def _enqueue(self, subject, change_set) -> None:
+        if self._closed:
+            return
+        if self.policy == 'sample':
+            if self._queue.qsize() < self.sample_above:
+                self._backlogged = 0
+            else:
+                self._backlogged += 1
+                if self._backlogged % self.sample_every:
+                    self.dropped += 1
+                    return
+        
+        item = (subject.snapshot(), change_set)
+        if self.policy == 'block':
+            self._queue.put(item)
+            return
+        while True:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                if self.policy == 'sample':
+                    self.dropped += 1
+                    return
+            try:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            try:
+                self.handler(*item)
+            except Exception as e:
+                self.errors += 1
+                print(f"Async observer error: {e}")
+            finally:
+                self._queue.task_done()
+
+    # Waits until everything queued so far has been handled
+    def drain(self) -> None:
+        self._queue.join()
+
+    # Stops accepting snapshots, lets the worker finish the queue and joins it
+    def close(self, timeout: float = None) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join(timeout)
@@ -0,0 +1,121 @@
+# rollout.py
+
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from headless import GAMES, DEFAULT_AGENTS, HeadlessRunner
+
+def run_shard(game_name, count, seed, max_steps=5000, dt=0.033, agent_class=None, game_options=None):
+    # Runs one batch of games in a worker; every game and agent gets its own
+    # Random derived from the shard seed so results don't depend on scheduling
+    game_class = GAMES[game_name]
+    agent_class = agent_class if agent_class else DEFAULT_AGENTS[game_class]
+    runner = HeadlessRunner(game_class, max_steps=max_steps, dt=dt, game_options=game_options)
+    shard_rng = random.Random(seed)
+
+    results = []
+    start = time.perf_counter()
+    for _ in range(count):
+        game_rng = random.Random(shard_rng.getrandbits(64))
+        agent = agent_class(random.Random(shard_rng.getrandbits(64)))
+        results.append(runner.run_game(agent, rng=game_rng))
+    return results, time.perf_counter() - start
+
+class RolloutFarm:
+    """
+    Shards headless game simulations across a process pool.
+
+    ``run`` splits the requested games into shards of ``games_per_shard``,
+    seeds each shard from ``seed`` and the shard index, and collects results
+    as shards finish, calling ``progress(games_done, games_total)`` if given.
+    ``results`` are returned in game order whatever order the shards finish in.
+    ``agent_class`` must be importable by the workers (a module-level class);
+    ``game_options`` are passed on to the game class as keyword arguments.
+    """
+    def __init__(self, game_name: str, workers: int = None, games_per_shard: int = 50,
+                 max_steps: int = 5000, dt: float = 0.033, agent_class=None, game_options=None):
+        self.game_name = game_name
+        self.workers = workers
+        self.games_per_shard = games_per_shard
+        self.max_steps = max_steps
+        self.dt = dt
+        self.agent_class = agent_class
+        self.game_options = game_options
+
+    def shards(self, num_games: int, seed: int):
+        shards = []
+        for index, first in enumerate(range(0, num_games, self.games_per_shard)):
+            count = min(self.games_per_shard, num_games - first)
+            shards.append((count, seed * 1000003 + index))
+        return shards
+
+    def run(self, num_games: int, seed: int = 0, progress=None) -> dict:
+        shards = self.shards(num_games, seed)
+        shard_results = [None] * len(shards)
+        games_done = 0
+        worker_time = 0.0
+        start = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(run_shard, self.game_name, count, shard_seed,
+                            self.max_steps, self.dt, self.agent_class, self.game_options): index
+                for index, (count, shard_seed) in enumerate(shards)
+            }
+            for future in as_completed(futures):
+                results, shard_time = future.result()
+                # Stored by shard index so the results come back in game order
+                shard_results[futures[future]] = results
+                games_done += len(results)
+                worker_time += shard_time
+                if progress:
+                    progress(games_done, num_games)
+
+        results = [result for shard in shard_results for result in shard]
+        elapsed = time.perf_counter() - start
+        total_steps = sum(result['steps'] for result in results)
+        return {
+            'games': len(results),
+            'steps': total_steps,
+            'elapsed': elapsed,
+            'worker_time': worker_time,
+            'games_per_sec': len(results) / elapsed if elapsed > 0 else float('inf'),
+            'steps_per_sec': total_steps / elapsed if elapsed > 0 else float('inf'),
+            'mean_score': sum(result['score'] for result in results) / len(results) if results else 0,
+            'results': results,
+        }
+
+def print_progress(done, total):
+    sys.stderr.write(f"\r{done}/{total} games")
+    if done == total:
+        sys.stderr.write("\n")
+    sys.stderr.flush()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run TMGE games on a process pool")
+    parser.add_argument("game", choices=sorted(GAMES))
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--games-per-shard", type=int, default=50)
+    parser.add_argument("--max-steps", type=int, default=5000)
+    parser.add_argument("--dt", type=float, default=0.033)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bitboard", action="store_true", help="use the Candy Crush bitboard match kernel")
+    args = parser.parse_args(argv)
+    if args.bitboard and args.game != "candycrush":
+        parser.error("--bitboard only applies to candycrush")
+
+    farm = RolloutFarm(args.game, args.workers, args.games_per_shard, args.max_steps, args.dt,
+                       game_options={'use_bitboard': True} if args.bitboard else None)
+    report = farm.run(args.games, args.seed, progress=print_progress)
+
+    print(f"{args.game}: {report['games']} games, {report['steps']} steps in {report['elapsed']:.2f}s")
+    print(f"{report['games_per_sec']:.1f} games/sec, {report['steps_per_sec']:.0f} steps/sec")
+    print(f"Mean score: {report['mean_score']:.1f}")
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
-from tmge import Game, GameBoard, Tile, Location
+from tmge import Game, GameBoard, Tile, PlacedTile, zobrist_keys
 from observer import Subject
-import random
+from collections import namedtuple
+from operator import attrgetter
 
 # Defines all tetris pieces and their rotations
 pieces = {
@@ -39,7 +40,56 @@ pieces = {
     ]
 }
 
+# Compiled once at import and shared by every piece. For each shape and rotation:
+#   cells      (row offset, column offset) of each block
+#   width      columns spanned, height rows spanned
+#   bottom     (column offset, lowest row offset) for every column the rotation covers
+#   row_masks  (row offset, column bitmask) collision masks
+#   kicks      (row, column) shifts tried in order when rotating into this rotation
+PieceRotation = namedtuple('PieceRotation', ['cells', 'width', 'height', 'bottom', 'row_masks', 'kicks'])
+
+piece_colors = {
+    'I': 'cyan', 'J': 'blue', 'L': 'orange',
+    'O': 'yellow', 'S': 'green', 'T': 'purple', 'Z': 'red'
+}
+
+def _compile_rotation(cells):
+    masks = {}
+    bottom = {}
+    for x, y in cells:
+        masks[y] = masks.get(y, 0) | (1 << x)
+        bottom[x] = max(bottom.get(x, y), y)
+    return PieceRotation(
+        cells=tuple((y, x) for x, y in cells),
+        width=max(x for x, _ in cells) + 1,
+        height=max(y for _, y in cells) + 1,
+        bottom=tuple(sorted(bottom.items())),
+        row_masks=tuple(sorted(masks.items())),
+        # Pieces rotate in place; no wall kicks
+        kicks=((0, 0),),
+    )
+
+piece_table = {
+    shape: tuple(_compile_rotation(cells) for cells in rotations)
+    for shape, rotations in pieces.items()
+}
+
+# A hard-drop landing spot; column and row are the piece's x_offset and y_offset
+Placement = namedtuple('Placement', ['rotation', 'column', 'row', 'lines'])
+
+# Immutable copy of a Tetris game; cells hold each grid cell's color or None
+TetrisSnapshot = namedtuple('TetrisSnapshot', [
+    'rows', 'cols', 'cells', 'current_piece', 'next_shape', 'score', 'level',
+    'lines_cleared', 'move_timer', 'move_delay', 'game_over', 'running',
+    'active_player_index', 'player_scores', 'timer', 'rng_state',
+])
+
+# What the Zobrist hash and the packed grid record for a tetris tile
+tetris_kind = attrgetter('color')
+
 class TetrisTile(Tile):
+    __slots__ = ('color',)
+    
     def __init__(self, location=None, color="cyan"):
         super().__init__(location, 100) 
         self.color = color
@@ -47,52 +97,62 @@ class TetrisTile(Tile):
     def __str__(self):
         return "[]"
 
+# Packed grid codec: code k holds the shared tile of the k-th piece color, 0 is empty
+tetris_tiles = (None,) + tuple(TetrisTile.of(color) for color in piece_colors.values())
+
 class TetrisPiece:
-    # Represents a tetris piece with position rotation and color
-    def __init__(self, shape, x_offset=3, y_offset=0):
+    # A piece is just its shape, rotation and position; cell data comes from piece_table
+    def __init__(self, shape, x_offset=3, y_offset=0, rotation=0):
         self.shape = shape
-        self.rotation = 0
-        self.tiles = []
+        self.rotation = rotation
         self.x_offset = x_offset
         self.y_offset = y_offset
-        
-        colors = {
-            'I': 'cyan', 'J': 'blue', 'L': 'orange',
-            'O': 'yellow', 'S': 'green', 'T': 'purple', 'Z': 'red'
-        }
-        
-        for x, y in pieces[shape][self.rotation]:
-            loc = Location(y + y_offset, x + x_offset)
-            tile = TetrisTile(loc, colors[shape])
-            self.tiles.append(tile)
+        self.color = piece_colors[shape]
+    
+    @property
+    def table(self):
+        return piece_table[self.shape][self.rotation]
+    
+    # Grid (i, j) cells covered by the piece
+    def cells(self):
+        return [(self.y_offset + dy, self.x_offset + dx) for dy, dx in self.table.cells]
+    
+    # The piece's tiles with their grid positions, for callers using getLocation()
+    @property
+    def tiles(self):
+        tile = TetrisTile.of(self.color)
+        return [PlacedTile(tile, i, j) for i, j in self.cells()]
     
     def rotate(self):
-        self.rotation = (self.rotation + 1) % len(pieces[self.shape])
-        for idx, (x, y) in enumerate(pieces[self.shape][self.rotation]):
-            location = self.tiles[idx].getLocation()
-            location.setI_Location(y + self.y_offset)
-            location.setJ_Location(x + self.x_offset)
+        self.rotation = (self.rotation + 1) % len(piece_table[self.shape])
     
     def move(self, di, dj):
         self.y_offset += di
         self.x_offset += dj
-        
-        for tile in self.tiles:
-            location = tile.getLocation()
-            location.setI_Location(location.getI_Location() + di)
-            location.setJ_Location(location.getJ_Location() + dj)
 
 class TetrisBoard(GameBoard):
     # Manages the game board state, piece movement and collision detection
-    def __init__(self, rows: int = 20, cols: int = 10):
-        super().__init__(rows, cols)
+    tile_kind = tetris_kind
+    tile_set = tetris_tiles
+    
+    def __init__(self, rows: int = 20, cols: int = 10, rng=None, packed_grid: bool = False,
+                 hashing: bool = False):
+        super().__init__(rows, cols, rng=rng, packed_grid=packed_grid, hashing=hashing)
+        # Bitboard of locked cells, one int per row with bit j set for column j
+        self.row_masks = [0] * rows
+        self.full_row = (1 << cols) - 1
+        # Occupied cells per row, including the active piece
+        self.row_counts = [0] * rows
+        # Skyline: row of the highest locked cell in each column, rows when empty
+        self.skyline = [rows] * cols
+        self.last_cleared_rows = []
         self.current_piece = None
         self.next_piece = None
         self.generate_next_piece()
         
     def generate_next_piece(self):
         shapes = list(pieces.keys())
-        return TetrisPiece(random.choice(shapes))
+        return TetrisPiece(self.rng.choice(shapes))
     
     def spawn_piece(self):
         if self.current_piece:
@@ -116,95 +176,261 @@ class TetrisBoard(GameBoard):
         return True
         
     def place_piece(self):
-        for tile in self.current_piece.tiles:
-            location = tile.getLocation()
-            i, j = location.getI_Location(), location.getJ_Location()
+        piece = self.current_piece
+        tile = TetrisTile.of(piece.color)
+        for i, j in piece.cells():
             self.plane.set_tile(i, j, tile)
+            self.row_counts[i] += 1
     
     def remove_piece(self):
         if self.current_piece:
-            for tile in self.current_piece.tiles:
-                location = tile.getLocation()
-                i, j = location.getI_Location(), location.getJ_Location()
+            for i, j in self.current_piece.cells():
                 self.plane.clear_tile(i, j)
+                self.row_counts[i] -= 1
     
     # Checks if a piece's position is valid 
     def is_valid_position(self, piece):
-        for tile in piece.tiles:
-            location = tile.getLocation()
-            i, j = location.getI_Location(), location.getJ_Location()
-            
-            if (i < 0 or i >= self.plane.i_length or
-                j < 0 or j >= self.plane.j_length):
-                return False
-                
-            existing_tile = self.plane.get_tile(i, j)
-            if existing_tile and existing_tile not in piece.tiles:
+        return self.fits(piece.shape, piece.rotation, piece.y_offset, piece.x_offset)
+    
+    # Tests a shape/rotation at a position against the locked-cell bitboard
+    def fits(self, shape, rotation, row, col):
+        compiled = piece_table[shape][rotation]
+        if col < 0 or col + compiled.width > self.plane.j_length:
+            return False
+        
+        row_masks = self.row_masks
+        rows = self.plane.i_length
+        for dy, mask in compiled.row_masks:
+            r = row + dy
+            if r < 0 or r >= rows or row_masks[r] & (mask << col):
                 return False
         return True
     
+    # Row index of the highest locked cell in each column, or the row count if empty
+    def column_tops(self):
+        rows = self.plane.i_length
+        tops = [rows] * self.plane.j_length
+        seen = 0
+        for i, mask in enumerate(self.row_masks):
+            fresh = mask & ~seen
+            while fresh:
+                low = fresh & -fresh
+                tops[low.bit_length() - 1] = i
+                fresh ^= low
+            seen |= mask
+            if seen == self.full_row:
+                break
+        return tops
+    
+    # Every spot a piece (or shape name, starting from the spawn position) can be
+    # hard-dropped to, with the lines that landing would clear, without touching the
+    # grid. Only poses the piece can reach from where it is by sliding sideways and
+    # rotating at its current height are considered, so every placement is playable.
+    def enumerate_placements(self, piece=None):
+        piece = piece if piece else self.current_piece
+        if not piece:
+            return []
+        if isinstance(piece, str):
+            piece = TetrisPiece(piece)
+        shape = piece.shape
+        
+        start = (piece.rotation, piece.y_offset, piece.x_offset)
+        if not self.fits(shape, *start):
+            return []
+        
+        rotations = piece_table[shape]
+        seen = {start}
+        frontier = [start]
+        while frontier:
+            rotation, row, col = frontier.pop()
+            moves = [(rotation, row, col - 1), (rotation, row, col + 1)]
+            # Same kick order as rotate_piece: the first kick that fits is the one taken
+            turned = (rotation + 1) % len(rotations)
+            for di, dj in rotations[turned].kicks:
+                if self.fits(shape, turned, row + di, col + dj):
+                    moves.append((turned, row + di, col + dj))
+                    break
+            for move in moves:
+                if move not in seen and self.fits(shape, *move):
+                    seen.add(move)
+                    frontier.append(move)
+        
+        row_masks = self.row_masks
+        full_row = self.full_row
+        placements = set()
+        for rotation, row, col in seen:
+            row = self._landing_row(shape, rotation, row, col)
+            lines = 0
+            for dy, mask in rotations[rotation].row_masks:
+                if row_masks[row + dy] | (mask << col) == full_row:
+                    lines += 1
+            placements.add(Placement(rotation, col, row, lines))
+        return sorted(placements)
+    
+    # Row a shape lands on when dropped from (row, col). Read off the skyline when the
+    # piece is above every column it covers, otherwise found by scanning the bitboard.
+    def _landing_row(self, shape, rotation, row, col):
+        skyline = self.skyline
+        bottom = piece_table[shape][rotation].bottom
+        if all(row + dy < skyline[col + dx] for dx, dy in bottom):
+            return min(skyline[col + dx] - 1 - dy for dx, dy in bottom)
+        
+        while self.fits(shape, rotation, row + 1, col):
+            row += 1
+        return row
+    
+    # Rows the piece can fall before it lands
+    def drop_distance(self, piece=None):
+        piece = piece if piece else self.current_piece
+        if not piece:
+            return 0
+        return self._landing_row(piece.shape, piece.rotation, piece.y_offset, piece.x_offset) - piece.y_offset
+    
+    # Moves the active piece straight to its landing row in one step; returns the rows dropped
+    def hard_drop(self):
+        distance = self.drop_distance()
+        if distance:
+            self.remove_piece()
+            self.current_piece.move(distance, 0)
+            self.place_piece()
+        return distance
+    
+    # Grid cells the active piece would occupy after a hard drop
+    def ghost_cells(self):
+        piece = self.current_piece
+        if not piece:
+            return []
+        row = piece.y_offset + self.drop_distance(piece)
+        col = piece.x_offset
+        return [(row + dy, col + dx) for dy, dx in piece.table.cells]
+    
+    # Rebuilds the bitboard (ignoring the active piece) and row counts from the grid
+    def sync_bitboard(self):
+        grid = self.plane
+        piece_cells = set(self.current_piece.cells()) if self.current_piece else set()
+        
+        for i in range(grid.i_length):
+            mask = 0
+            count = 0
+            for j in range(grid.j_length):
+                if grid.get_tile(i, j):
+                    count += 1
+                    if (i, j) not in piece_cells:
+                        mask |= 1 << j
+            self.row_masks[i] = mask
+            self.row_counts[i] = count
+        self.skyline = self.column_tops()
+    
     def move_piece(self, di, dj):
-        if not self.current_piece:
+        piece = self.current_piece
+        if not piece:
             return False
-            
-        self.remove_piece()
-        self.current_piece.move(di, dj)
         
-        if self.is_valid_position(self.current_piece):
-            self.place_piece()
-            return True
-        else:
-            self.current_piece.move(-di, -dj)
-            self.place_piece()
+        if not self.fits(piece.shape, piece.rotation, piece.y_offset + di, piece.x_offset + dj):
             return False
+        
+        self.remove_piece()
+        piece.move(di, dj)
+        self.place_piece()
+        return True
     
     def rotate_piece(self):
-        if not self.current_piece:
+        piece = self.current_piece
+        if not piece:
             return False
-            
-        self.remove_piece()
-        original_rotation = self.current_piece.rotation
-        self.current_piece.rotate()
         
-        if self.is_valid_position(self.current_piece):
-            self.place_piece()
-            return True
-        else:
-            self.current_piece.rotation = original_rotation
-            for idx, (x, y) in enumerate(pieces[self.current_piece.shape][self.current_piece.rotation]):
-                location = self.current_piece.tiles[idx].getLocation()
-                location.setI_Location(y + self.current_piece.y_offset)
-                location.setJ_Location(x + self.current_piece.x_offset)
-            self.place_piece()
-            return False
+        rotations = piece_table[piece.shape]
+        rotation = (piece.rotation + 1) % len(rotations)
+        for di, dj in rotations[rotation].kicks:
+            if self.fits(piece.shape, rotation, piece.y_offset + di, piece.x_offset + dj):
+                self.remove_piece()
+                piece.rotate()
+                piece.move(di, dj)
+                self.place_piece()
+                return True
+        return False
     
     # Handles line clearing and updates the board state
     def clear_full_lines(self):
-        lines_cleared = 0
         grid = self.plane
+        full_rows = [i for i, count in enumerate(self.row_counts) if count == grid.j_length]
+        self.last_cleared_rows = full_rows
+        if not full_rows:
+            return 0
+        
+        # Single-pass compaction: drop every full row at once and pad the top
+        grid.remove_rows(full_rows)
+        cleared = set(full_rows)
+        padding = [0] * len(full_rows)
+        self.row_masks = padding + [m for i, m in enumerate(self.row_masks) if i not in cleared]
+        self.row_counts = padding + [c for i, c in enumerate(self.row_counts) if i not in cleared]
+        self.skyline = self.column_tops()
         
+        return len(full_rows)
+    
+    # Zobrist hash of the grid (active piece included), the piece's pose and the next shape
+    def state_hash(self):
+        value = super().state_hash()
+        piece = self.current_piece
+        if piece:
+            value ^= zobrist_keys.key('piece', piece.shape, piece.rotation, piece.y_offset, piece.x_offset)
+        if self.next_piece:
+            value ^= zobrist_keys.key('next', self.next_piece.shape)
+        return value
+    
+    # Returns (cells, current piece) where cells is a row-major tuple of colors and the
+    # piece is (shape, rotation, y_offset, x_offset, on_grid). on_grid is False for a
+    # piece that failed to spawn, which never made it onto the grid
+    def get_state(self):
+        grid = self.plane
+        cells = []
         for i in range(grid.i_length):
-            is_full = True
             for j in range(grid.j_length):
-                if not grid.get_tile(i, j):
-                    is_full = False
-                    break
-            
-            if is_full:
-                lines_cleared += 1
-                for row in range(i, 0, -1):
-                    for col in range(grid.j_length):
-                        above_tile = grid.get_tile(row-1, col)
-                        grid.set_tile(row, col, above_tile)
-                
-                for col in range(grid.j_length):
-                    grid.clear_tile(0, col)
+                tile = grid.get_tile(i, j)
+                cells.append(tile.color if tile else None)
         
-        return lines_cleared
+        piece = self.current_piece
+        current = None
+        if piece:
+            # An active piece always fits the locked cells; one that failed to spawn does not
+            on_grid = self.is_valid_position(piece)
+            current = (piece.shape, piece.rotation, piece.y_offset, piece.x_offset, on_grid)
+        return tuple(cells), current
+    
+    def set_state(self, cells, current, next_shape):
+        grid = self.plane
+        cols = grid.j_length
+        for i in range(grid.i_length):
+            for j in range(cols):
+                color = cells[i * cols + j]
+                grid.set_tile(i, j, TetrisTile.of(color) if color else None)
+        
+        self.current_piece = None
+        piece = None
+        if current:
+            shape, rotation, y_offset, x_offset, on_grid = current
+            piece = TetrisPiece(shape, x_offset, y_offset, rotation)
+            if on_grid:
+                self.current_piece = piece
+                # The grid cells under the piece must be the piece's own tiles
+                self.remove_piece()
+                self.place_piece()
+        
+        self.next_piece = TetrisPiece(next_shape) if next_shape else None
+        self.sync_bitboard()
+        self.current_piece = piece
     
     def lock_piece(self):
-        if not self.current_piece:
+        piece = self.current_piece
+        if not piece:
             return 0
+        
+        compiled = piece.table
+        for dy, mask in compiled.row_masks:
+            self.row_masks[piece.y_offset + dy] |= mask << piece.x_offset
+        skyline = self.skyline
+        for i, j in piece.cells():
+            skyline[j] = min(skyline[j], i)
             
         lines_cleared = self.clear_full_lines()
         self.current_piece = None
@@ -212,9 +438,11 @@ class TetrisBoard(GameBoard):
 
 class Tetris(Game):
     # Main game logic controller handling scoring levels and flow
-    def __init__(self):
-        super().__init__()
-        self.board = TetrisBoard()
+    def __init__(self, clock=None, rng=None, packed_grid: bool = False):
+        super().__init__(clock)
+        self.rng = rng
+        self.packed_grid = packed_grid
+        self.board = self._new_board()
         self._running = False
         self.score = 0
         self.level = 1
@@ -225,6 +453,9 @@ class Tetris(Game):
         self.game_over = False
         self.active_player_index = 0
         
+    def _new_board(self, rows=20, cols=10):
+        return TetrisBoard(rows, cols, rng=self.rng, packed_grid=self.packed_grid)
+        
     def add_player(self, player):
         self.players.append(player)
         
@@ -241,9 +472,10 @@ class Tetris(Game):
             success = self.board.spawn_piece()
             if not success:
                 print("Failed to place initial piece, creating new board")
-                self.board = TetrisBoard()
+                self.board = self._new_board()
                 self.board.spawn_piece()
         
+        self.record_change('reset')
         self.notify_observers()
         print("Tetris started")
 
@@ -256,6 +488,8 @@ class Tetris(Game):
     def stop(self):
         self._running = False
         self.timer.stop()
+        # No more ticks will come, so hand throttled and coalescing observers what is left
+        self.notify_observers(force=True)
         print("Tetris stopped")
     
     def switch_player(self):
@@ -275,28 +509,41 @@ class Tetris(Game):
             return
             
         if key == 'LEFT':
-            self.board.move_piece(0, -1)
+            if self.board.move_piece(0, -1):
+                self._record_piece()
         elif key == 'RIGHT':
-            self.board.move_piece(0, 1)
+            if self.board.move_piece(0, 1):
+                self._record_piece()
         elif key == 'DOWN':
             if self.board.move_piece(1, 0):
                 self.score += 1
+                self._record_piece()
+                self.record_change('score', self.score)
         elif key == 'UP':
-            self.board.rotate_piece()
+            if self.board.rotate_piece():
+                self._record_piece()
         elif key == 'SPACE':
-            while self.board.move_piece(1, 0):
-                self.score += 2
-            
+            distance = self.board.hard_drop()
+            if distance:
+                self.score += 2 * distance
+                self.record_change('score', self.score)
             self.process_piece_lock()
         elif key == 'TAB':
             if self.switch_player():
+                self.record_change('player', self.active_player_index)
                 active_player = self.get_active_player()
                 if active_player:
                     print(f"Active player: {active_player.name}")
 
+    def _record_piece(self):
+        piece = self.board.current_piece
+        if piece:
+            self.record_change('piece', (piece.shape, piece.rotation, piece.y_offset, piece.x_offset))
+    
     # Updates piece position based on timer
     def process_piece_lock(self):
         lines = self.board.lock_piece()
+        self.record_change('lock', tuple(self.board.last_cleared_rows))
         if lines > 0:
             line_scores = [100, 300, 500, 800]
             points = line_scores[min(lines, 4) - 1] * self.level
@@ -310,9 +557,11 @@ class Tetris(Game):
             self.level = (self.lines_cleared // 10) + 1
             
             self.move_delay = max(0.1, 1.0 - (self.level - 1) * 0.05)
+            self.record_change('score', self.score)
         
         if not self.board.spawn_piece():
             self.game_over = True
+            self.record_change('game_over')
             self.stop()
             
             active_player = self.get_active_player()
@@ -320,6 +569,8 @@ class Tetris(Game):
                 print(f"Game Over! Player {active_player.name}'s Final Score: {active_player.score}")
             else:
                 print(f"Game Over! Final Score: {self.score}")
+        else:
+            self._record_piece()
 
     def update(self):
         if not self._running or self.game_over:
@@ -328,20 +579,66 @@ class Tetris(Game):
         if not self.board.current_piece and not self.game_over:
             if not self.board.spawn_piece():
                 self.game_over = True
+                self.record_change('game_over')
                 self.stop()
+                self.notify_observers()
                 return
+            self._record_piece()
             
         elapsed = self.timer.get_time() - self.move_timer
         
         if elapsed >= self.move_delay:
             print(f"Moving piece down after {elapsed} seconds")
-            if not self.board.move_piece(1, 0):
+            if self.board.move_piece(1, 0):
+                self._record_piece()
+            else:
                 self.process_piece_lock()
             
             self.move_timer = self.timer.get_time()
         
         self.notify_observers()
         
+    def snapshot(self):
+        cells, current = self.board.get_state()
+        next_piece = self.board.next_piece
+        return TetrisSnapshot(
+            rows=self.board.plane.i_length,
+            cols=self.board.plane.j_length,
+            cells=cells,
+            current_piece=current,
+            next_shape=next_piece.shape if next_piece else None,
+            score=self.score,
+            level=self.level,
+            lines_cleared=self.lines_cleared,
+            move_timer=self.move_timer,
+            move_delay=self.move_delay,
+            game_over=self.game_over,
+            running=self._running,
+            active_player_index=self.active_player_index,
+            player_scores=tuple(player.score for player in self.players),
+            timer=self.timer.get_state(),
+            rng_state=self.board.rng.getstate(),
+        )
+    
+    def restore(self, snapshot):
+        if (self.board.plane.i_length, self.board.plane.j_length) != (snapshot.rows, snapshot.cols):
+            self.board = self._new_board(snapshot.rows, snapshot.cols)
+        self.board.set_state(snapshot.cells, snapshot.current_piece, snapshot.next_shape)
+        self.board.rng.setstate(snapshot.rng_state)
+        
+        self.score = snapshot.score
+        self.level = snapshot.level
+        self.lines_cleared = snapshot.lines_cleared
+        self.move_timer = snapshot.move_timer
+        self.move_delay = snapshot.move_delay
+        self.game_over = snapshot.game_over
+        self._running = snapshot.running
+        self.active_player_index = snapshot.active_player_index
+        for player, score in zip(self.players, snapshot.player_scores):
+            player.update_score(score - player.score)
+        self.timer.set_state(snapshot.timer)
+        self.record_change('reset')
+        
     def get_display_data(self):
         player_data = []
         for idx, player in enumerate(self.players):
@@ -357,5 +654,6 @@ class Tetris(Game):
             'level': self.level,
             'lines': self.lines_cleared,
             'next_piece': self.board.next_piece,
+            'ghost': self.board.ghost_cells(),
             'players': player_data
         }
@@ -1,4 +1,7 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+import hashlib
+import random
 import time
 from observer import Subject
 
@@ -30,6 +33,8 @@ class Location:
     """
     Represents a location on the grid
     """
+    __slots__ = ('_i_coordinate', '_j_coordinate')
+
     def __init__(self, i_coordinate: int = 0, j_coordinate: int = 0):
         self._i_coordinate = i_coordinate
         self._j_coordinate = j_coordinate
@@ -48,13 +53,34 @@ class Location:
 
 class Tile:
     """
-    Represents an individual tile on the game board
+    Represents an individual tile on the game board.
+
+    Game boards store one shared (flyweight) tile per kind (see ``of``). A
+    shared tile has no position of its own, so its getLocation() raises
+    ValueError; use Grid.locate(i, j) for a tile that knows where it is.
     """
+    __slots__ = ('_location', '_points')
+    # Shared tiles by (class, kind), see of()
+    _shared = {}
+
     def __init__(self, location = None, points: int = 0):
         self._location = location if location else Location()
         self._points = points
 
+    # The one tile of this class shared by every cell holding ``kind``; boards never
+    # mutate it. Subclasses take (location, kind) as their first two arguments.
+    @classmethod
+    def of(cls, kind):
+        tile = Tile._shared.get((cls, kind))
+        if tile is None:
+            tile = Tile._shared[(cls, kind)] = cls(None, kind)
+            tile._location = None
+        return tile
+
     def getLocation(self) -> Location:
+        if self._location is None:
+            raise ValueError(f"{type(self).__name__} is shared by many cells and has no location; "
+                             "use Grid.locate(i, j)")
         return self._location
 
     def setLocation(self, loc: Location) -> None:
@@ -68,6 +94,78 @@ class Tile:
     def points(self, val: int) -> None:
         self._points = val
 
+class PlacedTile:
+    """
+    A grid tile seen at a particular position; getLocation() reports that position
+    and every other attribute is read from the underlying tile
+    """
+    __slots__ = ('tile', '_location')
+
+    def __init__(self, tile: Tile, i: int, j: int):
+        self.tile = tile
+        self._location = Location(i, j)
+
+    def getLocation(self) -> Location:
+        return self._location
+
+    def __getattr__(self, name):
+        # Only reached for attributes PlacedTile lacks; 'tile' itself is missing while
+        # copy and pickle rebuild the object, and dunders must not come from the tile
+        if name == 'tile' or name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.tile, name)
+
+class ZobristTable:
+    """
+    Stable 64-bit keys for Zobrist hashing, derived from the key parts and a seed
+    """
+    def __init__(self, seed: int = 0):
+        self.seed = seed
+        self._keys = {}
+
+    def key(self, *parts) -> int:
+        value = self._keys.get(parts)
+        if value is None:
+            digest = hashlib.blake2b(repr((self.seed,) + parts).encode(), digest_size=8).digest()
+            value = self._keys[parts] = int.from_bytes(digest, 'big')
+        return value
+
+# Shared table so equal boards hash equally across games
+zobrist_keys = ZobristTable()
+
+class TranspositionTable:
+    """
+    Bounded LRU cache keyed by board hashes
+    """
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: int, default=None):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key: int, value) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
 class Grid:
     """
     Represents the grid which has tiles
@@ -79,43 +177,250 @@ class Grid:
         self.matrix = [
             [None for _ in range(j_length)] for _ in range(i_length)
         ]
+        self.hash = 0
+        # Zobrist keys per cell once hashing is enabled, otherwise None
+        self._keys = None
+        self._kind_of = None
+
+    @property
+    def hashing(self) -> bool:
+        return self._keys is not None
 
     def get_tile(self, i: int, j: int):
         if 0 <= i < self.i_length and 0 <= j < self.j_length:
             return self.matrix[i][j]
         return None
 
+    # The tile at (i, j) together with its position, or None for an empty cell
+    def locate(self, i: int, j: int):
+        tile = self.get_tile(i, j)
+        return PlacedTile(tile, i, j) if tile else None
+
     def set_tile(self, i: int, j: int, tile: Tile) -> None:
         if 0 <= i < self.i_length and 0 <= j < self.j_length:
+            if self._keys is not None:
+                keys = self._keys[i][j]
+                old = self.matrix[i][j]
+                if old:
+                    self.hash ^= keys[self._kind_of(old)]
+                if tile:
+                    self.hash ^= keys[self._kind_of(tile)]
             self.matrix[i][j] = tile
 
     def clear_tile(self, i: int, j: int) -> None:
         if 0 <= i < self.i_length and 0 <= j < self.j_length:
+            if self._keys is not None:
+                self._toggle(i, j, self.matrix[i][j])
             self.matrix[i][j] = None
 
+    def enable_hashing(self, kind_of, kinds, table: ZobristTable = None) -> None:
+        """
+        Keeps ``hash`` up to date on every change from now on. ``kind_of(tile)``
+        names what a tile is and ``kinds`` lists every name it can return; the
+        key for each (cell, kind) is looked up once here.
+        """
+        table = table if table else zobrist_keys
+        self._kind_of = kind_of
+        self._keys = [
+            [{kind: table.key(i, j, kind) for kind in kinds} for j in range(self.j_length)]
+            for i in range(self.i_length)
+        ]
+        self.rehash()
+
+    def rehash(self) -> None:
+        self.hash = 0
+        if self._keys is None:
+            return
+        for i in range(self.i_length):
+            for j in range(self.j_length):
+                self._toggle(i, j, self.get_tile(i, j))
+
+    def _toggle(self, i: int, j: int, tile) -> None:
+        if tile:
+            self.hash ^= self._keys[i][j][self._kind_of(tile)]
+
+    def get_row(self, i: int) -> list:
+        return list(self.matrix[i])
+
+    def clear_row(self, i: int) -> None:
+        if self._keys is not None:
+            for j in range(self.j_length):
+                self._toggle(i, j, self.matrix[i][j])
+        self.matrix[i] = [None] * self.j_length
+
+    def remove_rows(self, rows) -> None:
+        # Drops the given rows and shifts everything above them down in one pass
+        drop = set(rows)
+        if not drop:
+            return
+        kept = [row for idx, row in enumerate(self.matrix) if idx not in drop]
+        fresh = [[None] * self.j_length for _ in range(self.i_length - len(kept))]
+        self.matrix = fresh + kept
+        self.rehash()
+
+class ArrayGrid(Grid):
+    """
+    Grid backend that packs each cell into a single byte type code.
+
+    ``tiles[code]`` is the tile handed back by ``get_tile`` for a code, typically
+    the shared flyweight for that kind, and ``tiles[0]`` is None for an empty
+    cell. ``kind_of(tile)`` names a tile's kind, which picks its code on
+    ``set_tile``; reads are a plain lookup with no callback.
+    """
+    def __init__(self, i_length: int, j_length: int, tiles, kind_of):
+        self.i_length = i_length
+        self.j_length = j_length
+        self.tiles = tuple(tiles)
+        self.kind_of = kind_of
+        self.codes = {kind_of(tile): code for code, tile in enumerate(self.tiles) if tile}
+        self.cells = bytearray(i_length * j_length)
+        self.hash = 0
+        # Flat Zobrist keys, cell index * len(tiles) + code, once hashing is enabled
+        self._keys = None
+
+    def get_tile(self, i: int, j: int):
+        if 0 <= i < self.i_length and 0 <= j < self.j_length:
+            return self.tiles[self.cells[i * self.j_length + j]]
+        return None
+
+    def set_tile(self, i: int, j: int, tile: Tile) -> None:
+        if 0 <= i < self.i_length and 0 <= j < self.j_length:
+            self.set_code(i, j, self.codes[self.kind_of(tile)] if tile else 0)
+
+    def clear_tile(self, i: int, j: int) -> None:
+        if 0 <= i < self.i_length and 0 <= j < self.j_length:
+            self.set_code(i, j, 0)
+
+    def set_code(self, i: int, j: int, code: int) -> None:
+        index = i * self.j_length + j
+        if self._keys is not None:
+            base = index * len(self.tiles)
+            self.hash ^= self._keys[base + self.cells[index]] ^ self._keys[base + code]
+        self.cells[index] = code
+
+    # Keys come from each code's tile kind, so both grid backends hash a board alike;
+    # kind_of and kinds are implied by the codec and only accepted for symmetry
+    def enable_hashing(self, kind_of=None, kinds=None, table: ZobristTable = None) -> None:
+        table = table if table else zobrist_keys
+        self._keys = []
+        for index in range(len(self.cells)):
+            i, j = divmod(index, self.j_length)
+            self._keys.extend(table.key(i, j, self.kind_of(tile)) if tile else 0 for tile in self.tiles)
+        self.rehash()
+
+    def rehash(self) -> None:
+        self.hash = 0
+        if self._keys is None:
+            return
+        ncodes = len(self.tiles)
+        for index, code in enumerate(self.cells):
+            self.hash ^= self._keys[index * ncodes + code]
+
+    def get_row(self, i: int) -> list:
+        return [self.get_tile(i, j) for j in range(self.j_length)]
+
+    def get_column_codes(self, j: int) -> bytes:
+        return bytes(self.cells[j::self.j_length])
+
+    def set_column_codes(self, j: int, codes) -> None:
+        if self._keys is not None:
+            for i, code in enumerate(codes):
+                self.set_code(i, j, code)
+            return
+        self.cells[j::self.j_length] = bytes(codes)
+
+    def clear_row(self, i: int) -> None:
+        if self._keys is not None:
+            for j in range(self.j_length):
+                self.set_code(i, j, 0)
+            return
+        start = i * self.j_length
+        self.cells[start:start + self.j_length] = bytes(self.j_length)
+
+    def remove_rows(self, rows) -> None:
+        drop = set(rows)
+        if not drop:
+            return
+        cols = self.j_length
+        kept = bytearray()
+        for i in range(self.i_length):
+            if i not in drop:
+                kept += self.cells[i * cols:(i + 1) * cols]
+        self.cells = bytearray(len(self.cells) - len(kept)) + kept
+        self.rehash()
+
 class GameBoard:
     """
-    Represents the game board
+    Represents the game board.
+
+    ``rng`` is where the board draws new tiles from: any random.Random-like
+    object (choice, shuffle, getstate/setstate). By default it is the shared
+    module-level generator in ``random``.
+
+    Subclasses describe their tiles with ``tile_kind(tile)``, which names a
+    tile's kind, and ``tile_set``, the shared tile for each packed code with
+    ``tile_set[0]`` None. With those, ``packed_grid`` stores the cells one
+    byte each in an ArrayGrid, and ``hashing`` keeps a Zobrist hash of the
+    grid for ``state_hash``. Hashing costs a little on every grid write, so it
+    is off unless asked for here, by enable_hashing() or by state_hash().
     """
-    def __init__(self, rows: int, cols: int):
-        self.plane = Grid(rows, cols)
+    tile_kind = None
+    tile_set = ()
+
+    def __init__(self, rows: int, cols: int, grid: Grid = None, rng=None,
+                 packed_grid: bool = False, hashing: bool = False):
+        if grid is None and packed_grid:
+            grid = ArrayGrid(rows, cols, self.tile_set, self.tile_kind)
+        self.plane = grid if grid is not None else Grid(rows, cols)
+        self.rng = rng if rng else random
+        if hashing:
+            self.enable_hashing()
 
     def get_grid(self) -> Grid:
         return self.plane
 
+    def enable_hashing(self, kind_of=None, kinds=None) -> None:
+        kind_of = kind_of if kind_of else self.tile_kind
+        if kinds is None:
+            kinds = [kind_of(tile) for tile in self.tile_set if tile]
+        self.plane.enable_hashing(kind_of, kinds)
+
+    # Zobrist hash of the grid, turning hashing on at the first call; subclasses
+    # fold in whatever else makes up their state
+    def state_hash(self) -> int:
+        if not self.plane.hashing:
+            self.enable_hashing()
+        return self.plane.hash
+
+
+class VirtualClock:
+    """
+    Manually advanced clock so games can be stepped by a fixed dt
+    """
+    def __init__(self, start: float = 0.0):
+        self._now = start
+
+    def __call__(self) -> float:
+        return self._now
+
+    def advance(self, dt: float) -> None:
+        self._now += dt
+
 
 class Timer:
-    def __init__(self):
+    def __init__(self, clock=None):
+        # Any zero-argument callable returning seconds; monotonic wall time by default
+        self._clock = clock if clock else time.monotonic
         self._start_time = None
         self._elapsed = 0
 
     def start(self):
         if self._start_time is None:
-            self._start_time = time.time()
+            self._start_time = self._clock()
 
     def stop(self):
         if self._start_time is not None:
-            self._elapsed += time.time() - self._start_time
+            self._elapsed += self._clock() - self._start_time
             self._start_time = None
 
     def reset(self):
@@ -125,9 +430,17 @@ class Timer:
     def get_time(self) -> float:
         total = self._elapsed
         if self._start_time is not None:
-            total += (time.time() - self._start_time)
+            total += (self._clock() - self._start_time)
         return total
 
+    def get_state(self) -> tuple:
+        return (self.get_time(), self._start_time is not None)
+
+    def set_state(self, state: tuple) -> None:
+        # Resumes from the saved reading; a running timer keeps counting from now
+        self._elapsed, running = state
+        self._start_time = self._clock() if running else None
+
 
 class Menu:
     """
@@ -150,9 +463,11 @@ class Game(Subject, ABC):
     """
     Base Game class
     """
-    def __init__(self):
+    def __init__(self, clock=None):
         super().__init__()  
-        self.timer = Timer()
+        self.timer = Timer(clock)
+        if clock:
+            self.notify_clock = clock
         self._running = False
 
     @abstractmethod
@@ -170,3 +485,12 @@ class Game(Subject, ABC):
     @abstractmethod
     def update(self):
         pass
+
+    def snapshot(self):
+        """
+        Captures the full game state as an immutable value for restore()
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support snapshots")
+
+    def restore(self, snapshot) -> None:
+        raise NotImplementedError(f"{type(self).__name__} does not support snapshots")
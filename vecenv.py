@@ -0,0 +1,314 @@
+# vecenv.py
+
+import numpy as np
+
+from tetris import pieces
+from candycrush import CANDY_TYPES
+
+# Batched Tetris actions, matching the keys Tetris.handle_input understands
+TETRIS_ACTIONS = ('NOOP', 'LEFT', 'RIGHT', 'DOWN', 'UP', 'SPACE')
+NOOP, LEFT, RIGHT, DOWN, ROTATE, DROP = range(len(TETRIS_ACTIONS))
+
+TETRIS_SHAPES = list(pieces.keys())
+TETRIS_LINE_SCORES = np.array([0, 100, 300, 500, 800], dtype=np.int64)
+
+def _compile_tetris_tables():
+    # Cell offsets per shape and rotation, padded to 4 rotations by cycling
+    rows = np.zeros((len(TETRIS_SHAPES), 4, 4), dtype=np.int64)
+    cols = np.zeros((len(TETRIS_SHAPES), 4, 4), dtype=np.int64)
+    num_rotations = np.zeros(len(TETRIS_SHAPES), dtype=np.int64)
+    for s, shape in enumerate(TETRIS_SHAPES):
+        rotations = pieces[shape]
+        num_rotations[s] = len(rotations)
+        for r in range(4):
+            for c, (x, y) in enumerate(rotations[r % len(rotations)]):
+                rows[s, r, c] = y
+                cols[s, r, c] = x
+    return rows, cols, num_rotations
+
+_CELL_ROWS, _CELL_COLS, _NUM_ROTATIONS = _compile_tetris_tables()
+
+class VecTetris:
+    """
+    N Tetris boards stepped in lock-step over a single (N, rows, cols) array.
+
+    ``boards`` holds locked cells only (0 empty, shape index + 1 otherwise);
+    the falling piece of each env lives in the ``shape``/``rotation``/``row``/
+    ``col`` vectors. Movement, rotation, hard drop, line clears and scoring
+    follow TetrisBoard and Tetris.process_piece_lock. Every step is one
+    gravity tick.
+    """
+    def __init__(self, num_envs: int, rows: int = 20, cols: int = 10, seed=None,
+                 spawn_col: int = 3):
+        self.num_envs = num_envs
+        self.rows = rows
+        self.cols = cols
+        self.spawn_col = spawn_col
+        self.rng = np.random.default_rng(seed)
+
+        self.boards = np.zeros((num_envs, rows, cols), dtype=np.uint8)
+        self.shape = np.zeros(num_envs, dtype=np.int64)
+        self.next_shape = np.zeros(num_envs, dtype=np.int64)
+        self.rotation = np.zeros(num_envs, dtype=np.int64)
+        self.row = np.zeros(num_envs, dtype=np.int64)
+        self.col = np.zeros(num_envs, dtype=np.int64)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.lines = np.zeros(num_envs, dtype=np.int64)
+        self.level = np.ones(num_envs, dtype=np.int64)
+        self.done = np.zeros(num_envs, dtype=bool)
+        self.reset()
+
+    def reset(self, envs=None):
+        envs = np.arange(self.num_envs) if envs is None else np.asarray(envs)
+        self.boards[envs] = 0
+        self.score[envs] = 0
+        self.lines[envs] = 0
+        self.level[envs] = 1
+        self.done[envs] = False
+        self.next_shape[envs] = self._random_shapes(len(envs))
+        self._spawn(envs)
+
+    def _random_shapes(self, count):
+        return self.rng.integers(0, len(TETRIS_SHAPES), size=count)
+
+    # Returns a (k,) bool array: does each env's piece fit at the given placement
+    def fits(self, envs, shape, rotation, row, col):
+        cell_rows = row[:, None] + _CELL_ROWS[shape, rotation]
+        cell_cols = col[:, None] + _CELL_COLS[shape, rotation]
+        inside = ((cell_rows >= 0) & (cell_rows < self.rows) &
+                  (cell_cols >= 0) & (cell_cols < self.cols))
+        occupied = self.boards[
+            envs[:, None],
+            np.clip(cell_rows, 0, self.rows - 1),
+            np.clip(cell_cols, 0, self.cols - 1),
+        ] != 0
+        return np.all(inside & ~occupied, axis=1)
+
+    def _spawn(self, envs):
+        if len(envs) == 0:
+            return
+        self.shape[envs] = self.next_shape[envs]
+        self.next_shape[envs] = self._random_shapes(len(envs))
+        self.rotation[envs] = 0
+        self.row[envs] = 0
+        self.col[envs] = self.spawn_col
+
+        blocked = ~self.fits(envs, self.shape[envs], self.rotation[envs], self.row[envs], self.col[envs])
+        self.done[envs[blocked]] = True
+
+    def _lock(self, envs):
+        # Writes pieces into their boards, clears full rows and scores the clears
+        if len(envs) == 0:
+            return np.zeros(0, dtype=np.int64)
+        shape = self.shape[envs]
+        cell_rows = self.row[envs, None] + _CELL_ROWS[shape, self.rotation[envs]]
+        cell_cols = self.col[envs, None] + _CELL_COLS[shape, self.rotation[envs]]
+        self.boards[envs[:, None], cell_rows, cell_cols] = (shape + 1)[:, None]
+
+        boards = self.boards[envs]
+        full = np.all(boards != 0, axis=2)
+        cleared = full.sum(axis=1)
+        # Stable sort moves full rows to the top in one pass; they are then emptied
+        order = np.argsort(~full, axis=1, kind='stable')
+        boards = np.take_along_axis(boards, order[:, :, None], axis=1)
+        boards[np.arange(self.rows)[None, :] < cleared[:, None]] = 0
+        self.boards[envs] = boards
+
+        self.score[envs] += TETRIS_LINE_SCORES[np.minimum(cleared, 4)] * self.level[envs]
+        self.lines[envs] += cleared
+        self.level[envs] = self.lines[envs] // 10 + 1
+
+        self._spawn(envs)
+        return cleared
+
+    def step(self, actions):
+        """
+        Applies one action per env followed by a gravity tick.
+
+        Returns (rewards, lines_cleared, done) arrays; finished envs ignore
+        their action until they are reset.
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        previous_score = self.score.copy()
+        lines_cleared = np.zeros(self.num_envs, dtype=np.int64)
+        live = ~self.done
+
+        moving = live & (actions >= LEFT) & (actions <= ROTATE)
+        envs = np.flatnonzero(moving)
+        if len(envs):
+            a = actions[envs]
+            shape = self.shape[envs]
+            rotation = np.where(a == ROTATE, (self.rotation[envs] + 1) % _NUM_ROTATIONS[shape], self.rotation[envs])
+            row = self.row[envs] + (a == DOWN)
+            col = self.col[envs] - (a == LEFT) + (a == RIGHT)
+            ok = self.fits(envs, shape, rotation, row, col)
+            moved = envs[ok]
+            self.rotation[moved] = rotation[ok]
+            self.row[moved] = row[ok]
+            self.col[moved] = col[ok]
+            self.score[envs[ok & (a == DOWN)]] += 1
+
+        dropping = np.flatnonzero(live & (actions == DROP))
+        if len(dropping):
+            falling = dropping
+            while len(falling):
+                ok = self.fits(falling, self.shape[falling], self.rotation[falling],
+                               self.row[falling] + 1, self.col[falling])
+                falling = falling[ok]
+                self.row[falling] += 1
+                self.score[falling] += 2
+            lines_cleared[dropping] = self._lock(dropping)
+
+        ticking = np.flatnonzero(live & (actions != DROP))
+        if len(ticking):
+            ok = self.fits(ticking, self.shape[ticking], self.rotation[ticking],
+                           self.row[ticking] + 1, self.col[ticking])
+            self.row[ticking[ok]] += 1
+            landed = ticking[~ok]
+            lines_cleared[landed] = self._lock(landed)
+
+        return self.score - previous_score, lines_cleared, self.done.copy()
+
+    def render_boards(self):
+        # Locked cells plus each live env's falling piece
+        boards = self.boards.copy()
+        envs = np.flatnonzero(~self.done)
+        shape = self.shape[envs]
+        cell_rows = self.row[envs, None] + _CELL_ROWS[shape, self.rotation[envs]]
+        cell_cols = self.col[envs, None] + _CELL_COLS[shape, self.rotation[envs]]
+        boards[envs[:, None], cell_rows, cell_cols] = (shape + 1)[:, None]
+        return boards
+
+class VecCandyCrush:
+    """
+    N Candy Crush boards stepped in lock-step over a single (N, rows, cols) array.
+
+    Cells hold CANDY_TYPES index + 1 (0 only appears mid-cascade). A step
+    validates one swap per env, reverts swaps that make no match, then runs
+    every board's cascade together: clear matches, apply gravity, refill and
+    score with the cascade multiplier from CandyCrush.process_matches. Envs
+    drop out of the cascade loop as soon as their board settles.
+    """
+    def __init__(self, num_envs: int, rows: int = 9, cols: int = 9, seed=None,
+                 num_types: int = None, default_time: float = 60):
+        self.num_envs = num_envs
+        self.rows = rows
+        self.cols = cols
+        self.num_types = num_types if num_types else len(CANDY_TYPES)
+        self.default_time = default_time
+        self.rng = np.random.default_rng(seed)
+
+        self.boards = np.zeros((num_envs, rows, cols), dtype=np.int8)
+        self.score = np.zeros(num_envs, dtype=np.int64)
+        self.level = np.ones(num_envs, dtype=np.int64)
+        self.time_left = np.zeros(num_envs, dtype=np.float64)
+        self.done = np.zeros(num_envs, dtype=bool)
+        self.reset()
+
+    def reset(self, envs=None):
+        envs = np.arange(self.num_envs) if envs is None else np.asarray(envs)
+        self.boards[envs] = self._generate(len(envs))
+        self.score[envs] = 0
+        self.level[envs] = 1
+        self.time_left[envs] = self.default_time
+        self.done[envs] = False
+
+    def _generate(self, count):
+        # Same constructive rule as CandyCrushBoard.generate_match_free, one cell at a time for all boards
+        boards = np.zeros((count, self.rows, self.cols), dtype=np.int8)
+        everyone = np.arange(count)
+        for i in range(self.rows):
+            for j in range(self.cols):
+                weights = self.rng.random((count, self.num_types))
+                if j >= 2:
+                    left = boards[:, i, j - 1]
+                    pair = left == boards[:, i, j - 2]
+                    weights[everyone[pair], left[pair] - 1] = -1
+                if i >= 2:
+                    up = boards[:, i - 1, j]
+                    pair = up == boards[:, i - 2, j]
+                    weights[everyone[pair], up[pair] - 1] = -1
+                boards[:, i, j] = np.argmax(weights, axis=1) + 1
+        return boards
+
+    @staticmethod
+    def match_mask(boards):
+        # Marks cells in horizontal or vertical runs of 3+ for a stack of boards
+        mask = np.zeros(boards.shape, dtype=bool)
+        runs = ((boards[:, :, :-2] != 0) &
+                (boards[:, :, :-2] == boards[:, :, 1:-1]) &
+                (boards[:, :, 1:-1] == boards[:, :, 2:]))
+        mask[:, :, :-2] |= runs
+        mask[:, :, 1:-1] |= runs
+        mask[:, :, 2:] |= runs
+        runs = ((boards[:, :-2, :] != 0) &
+                (boards[:, :-2, :] == boards[:, 1:-1, :]) &
+                (boards[:, 1:-1, :] == boards[:, 2:, :]))
+        mask[:, :-2, :] |= runs
+        mask[:, 1:-1, :] |= runs
+        mask[:, 2:, :] |= runs
+        return mask
+
+    def _collapse(self, boards):
+        # Stable sort on "is filled" sinks candies below the holes, then holes are refilled
+        order = np.argsort(boards != 0, axis=1, kind='stable')
+        boards = np.take_along_axis(boards, order, axis=1)
+        self._refill(boards)
+        return boards
+
+    def _refill(self, boards):
+        empty = boards == 0
+        boards[empty] = self.rng.integers(1, self.num_types + 1, size=int(empty.sum()))
+
+    def step(self, swaps, dt: float = 0.0):
+        """
+        Applies one swap (i1, j1, i2, j2) per env, then advances timers by dt.
+
+        Returns (rewards, legal, done): score gained, whether the swap matched,
+        and which envs have run out of time.
+        """
+        swaps = np.asarray(swaps, dtype=np.int64).reshape(self.num_envs, 4)
+        i1, j1, i2, j2 = swaps.T
+        rewards = np.zeros(self.num_envs, dtype=np.int64)
+        legal = np.zeros(self.num_envs, dtype=bool)
+
+        inside = ((i1 >= 0) & (i1 < self.rows) & (j1 >= 0) & (j1 < self.cols) &
+                  (i2 >= 0) & (i2 < self.rows) & (j2 >= 0) & (j2 < self.cols))
+        adjacent = np.abs(i1 - i2) + np.abs(j1 - j2) == 1
+        envs = np.flatnonzero(~self.done & inside & adjacent)
+
+        if len(envs):
+            a = self.boards[envs, i1[envs], j1[envs]]
+            b = self.boards[envs, i2[envs], j2[envs]]
+            self.boards[envs, i1[envs], j1[envs]] = b
+            self.boards[envs, i2[envs], j2[envs]] = a
+
+            matched = self.match_mask(self.boards[envs]).any(axis=(1, 2))
+            reverted = envs[~matched]
+            self.boards[reverted, i1[reverted], j1[reverted]] = a[~matched]
+            self.boards[reverted, i2[reverted], j2[reverted]] = b[~matched]
+
+            cascading = envs[matched]
+            legal[cascading] = True
+            multiplier = 1
+            while len(cascading):
+                boards = self.boards[cascading]
+                mask = self.match_mask(boards)
+                counts = mask.sum(axis=(1, 2))
+                settled = counts == 0
+                cascading, boards, mask, counts = (
+                    cascading[~settled], boards[~settled], mask[~settled], counts[~settled])
+                if not len(cascading):
+                    break
+                rewards[cascading] += counts * 10 * multiplier
+                boards[mask] = 0
+                self.boards[cascading] = self._collapse(boards)
+                multiplier += 1
+
+        self.score += rewards
+        self.level = 1 + self.score // 1000
+        self.time_left[legal] += 1
+        self.time_left[~self.done] -= dt
+        self.done |= self.time_left <= 0
+        np.maximum(self.time_left, 0, out=self.time_left)
+        return rewards, legal, self.done.copy()